@@ -0,0 +1,178 @@
+import os
+
+import pygame
+
+from diskcache import CACHE_DIR, RawCache, resolve
+
+# Asset manager. Every (file, size) pair is decoded and scaled once per process,
+# and the scaled pixels go to the disk cache (diskcache.RawCache) as raw RGBA, so
+# smooth-scaling is skipped too. Small sprites can be packed into one atlas
+# surface, and non-critical images can be declared lazily or prepared on a
+# worker thread (prepare() there, install() on the main thread). Collision masks
+# are built from the same scaled images, once each.
+
+_tobytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+_frombytes = getattr(pygame.image, "frombytes", None) or pygame.image.fromstring
+
+class Atlas:
+    """Shelf-packed sheet for small sprites; handed-out sprites are subsurfaces of one surface."""
+
+    def __init__(self, size=(256, 256), padding=1):
+        self.surf = pygame.Surface(size, pygame.SRCALPHA)
+        self.padding = padding
+        self.x = 0; self.y = 0; self.shelf_h = 0
+
+    def add(self, surf):
+        """Copy `surf` into the sheet and return the matching subsurface, or None if it does not fit."""
+        w, h = surf.get_size(); p = self.padding
+        W, H = self.surf.get_size()
+        if self.x + w > W: self.x = 0; self.y += self.shelf_h + p; self.shelf_h = 0
+        if w > W or self.y + h > H: return None
+        r = pygame.Rect(self.x, self.y, w, h)
+        self.surf.blit(surf, r)
+        self.x += w + p; self.shelf_h = max(self.shelf_h, h)
+        return self.surf.subsurface(r)
+
+class LazyImages:
+    """Dict-like table whose images are only loaded the first time they are looked up."""
+
+    def __init__(self, loaders):
+        self.loaders = dict(loaders); self.loaded = {}
+
+    def __getitem__(self, key):
+        img = self.loaded.get(key)
+        if img is None:
+            img = self.loaded[key] = self.loaders[key]()
+        return img
+
+    def get(self, key, default=None):
+        return self[key] if key in self.loaders else default
+
+    def put(self, key, img):
+        """Install an image loaded elsewhere (e.g. prepared in the background)."""
+        self.loaded[key] = img
+
+    def drop(self, key):
+        """Unload; the next lookup loads it again."""
+        self.loaded.pop(key, None)
+
+    def first(self):
+        return self[next(iter(self.loaders))]
+
+    def __contains__(self, key):
+        return key in self.loaders
+
+class AssetManager:
+    def __init__(self, base_dir=".", cache_dir=CACHE_DIR, use_disk_cache=True):
+        self.base_dir = base_dir
+        self.cache = RawCache(os.path.join(base_dir, cache_dir), b"SRF1", "II", ".raw")   # width, height
+        self.use_disk_cache = use_disk_cache
+        self.images = {}      # (path, size) -> Surface
+        self.masks = {}       # (path, size, threshold) -> pygame.mask.Mask of that Surface
+        self.sources = {}     # path -> decoded full-size Surface, while a load batch is running
+        self.atlas = None
+        self.decodes = 0; self.disk_hits = 0
+
+    def _resolve(self, names):
+        return resolve(self.base_dir, names)
+
+    def _read_cache(self, path, size, mtime):
+        hit = self.cache.read(path, mtime, size)
+        if hit is None: return None
+        (w, h), pixels = hit
+        if len(pixels) != w * h * 4: return None
+        try: return _frombytes(pixels, (w, h), "RGBA")
+        except ValueError: return None
+
+    def _write_cache(self, path, size, mtime, surf):
+        try: pixels = _tobytes(surf, "RGBA")
+        except pygame.error: return
+        self.cache.write(path, mtime, surf.get_size(), pixels, size)
+
+    def _decode(self, path):
+        src = self.sources.get(path)
+        if src is None:
+            src = self.sources[path] = pygame.image.load(path).convert_alpha(); self.decodes += 1
+        return src
+
+    def image(self, *names, size=None, fallback_color=(200, 0, 0), atlas=False):
+        """Load the first existing file of `names`, scaled to `size`; a filled square if none load.
+
+        Same contract as the old load_image_try, but each (file, size) is decoded at most once
+        and the scaled result comes from the raw disk cache when it is up to date.
+        """
+        path = self._resolve(names)
+        key = (path, tuple(size) if size else None)
+        img = self.images.get(key) if path else None
+        if img is not None: return img
+        if path:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                img = self._read_cache(path, key[1], mtime) if self.use_disk_cache else None
+                if img is not None:
+                    img = img.convert_alpha(); self.disk_hits += 1
+                else:
+                    img = self._decode(path)
+                    if size: img = pygame.transform.scale(img, size)
+                    if self.use_disk_cache: self._write_cache(path, key[1], mtime, img)
+            except (pygame.error, OSError):
+                img = None
+        if img is None:
+            img = pygame.Surface(size if size else (40, 40), pygame.SRCALPHA)
+            img.fill(fallback_color)
+        if atlas:
+            if self.atlas is None: self.atlas = Atlas()
+            img = self.atlas.add(img) or img
+        if path: self.images[key] = img
+        return img
+
+    # ---------- Background loading ----------
+    def prepare(self, *names, size=None):
+        """The decode-and-scale half of image(), safe to run on a worker thread (no display calls).
+
+        Returns a token for install(); nothing is cached until then.
+        """
+        path = self._resolve(names)
+        key = (path, tuple(size) if size else None)
+        img = None
+        if path and key not in self.images:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                img = self._read_cache(path, key[1], mtime) if self.use_disk_cache else None
+                if img is not None:
+                    self.disk_hits += 1
+                else:
+                    img = pygame.image.load(path); self.decodes += 1
+                    if size: img = pygame.transform.scale(img, size)
+                    if self.use_disk_cache: self._write_cache(path, key[1], mtime, img)
+            except (pygame.error, OSError):
+                img = None
+        return names, size, img
+
+    def install(self, prepared, fallback_color=(200, 0, 0)):
+        """Finish a prepare()d image on the main thread: convert it and cache it as image() would."""
+        names, size, img = prepared
+        if img is None: return self.image(*names, size=size, fallback_color=fallback_color)
+        key = (self._resolve(names), tuple(size) if size else None)
+        cached = self.images.get(key)
+        if cached is None: cached = self.images[key] = img.convert_alpha()
+        return cached
+
+    def forget(self, *names, size=None):
+        """Drop an image (and masks built from it) from the caches, e.g. when its level is unloaded."""
+        path = self._resolve(names); size = tuple(size) if size else None
+        self.images.pop((path, size), None)
+        for key in [k for k in self.masks if k[:2] == (path, size)]: del self.masks[key]
+
+    def mask(self, *names, size=None, threshold=127, fallback_color=(200, 0, 0)):
+        """Collision mask of image(*names, size=size): opaque pixels (alpha > threshold), built once."""
+        key = (self._resolve(names), tuple(size) if size else None, threshold)
+        m = self.masks.get(key)
+        if m is None:
+            m = self.masks[key] = pygame.mask.from_surface(self.image(*names, size=size, fallback_color=fallback_color),
+                                                           threshold)
+        return m
+
+    def end_batch(self):
+        """Drop full-size decoded sources once everything that shares them has been scaled."""
+        self.sources.clear()
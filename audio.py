@@ -0,0 +1,129 @@
+import os
+from collections import deque
+
+import pygame
+
+from diskcache import CACHE_DIR, RawCache, resolve
+
+# Sound manager. Effects are declared up front but nothing touches the mixer until
+# the first sound is played (or preload() is called): the mixer is initialised
+# then, and each effect is decoded once. The decoded PCM goes to the disk cache
+# (diskcache.RawCache) tagged with the mixer format it was converted to; an entry
+# made for another format is ignored.
+#
+# Channels are reserved and split into named groups; an effect only ever plays on
+# its group's channels and has a polyphony limit. When the limit or the group is
+# full, the effect's (or group's) oldest voice is cut and reused, so heavy fire
+# never steals the channel of a kill sound and vice versa.
+
+MIXER_FORMAT = dict(frequency=44100, size=-16, channels=2, buffer=512)
+
+class Effect:
+    __slots__ = ("names", "volume", "group", "limit", "sound", "voices")
+
+    def __init__(self, names, volume, group, limit):
+        self.names = names; self.volume = volume; self.group = group; self.limit = limit
+        self.sound = None; self.voices = deque()
+
+class SoundManager:
+    def __init__(self, base_dir=".", groups=None, cache_dir=CACHE_DIR, use_disk_cache=True):
+        """`groups`: {group name: reserved channel count}."""
+        self.base_dir = base_dir
+        self.cache = RawCache(os.path.join(base_dir, cache_dir), b"PCM1", "iii", ".pcm")   # mixer frequency, format, channels
+        self.use_disk_cache = use_disk_cache
+        self.group_sizes = dict(groups or {"default": 8})
+        self.groups = {}        # group name -> deque of Channels, least recently started first
+        self.effects = {}
+        self.enabled = None     # None until the mixer has been tried
+        self.decodes = 0; self.disk_hits = 0; self.plays = 0; self.steals = 0
+
+    def add(self, name, *files, volume=1.0, group="default", limit=4):
+        """Declare effect `name`: the first existing file of `files`, at most `limit` voices at once."""
+        if group not in self.group_sizes: raise ValueError(f"unknown channel group: {group}")
+        self.effects[name] = Effect(files, volume, group, limit)
+
+    # ---------- Mixer ----------
+    def _start(self):
+        """Initialise the mixer (unless something already has) and reserve the group channels."""
+        try:
+            if not pygame.mixer.get_init(): pygame.mixer.init(**MIXER_FORMAT)
+            total = sum(self.group_sizes.values())
+            pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+            pygame.mixer.set_reserved(total)   # Sound.play() elsewhere cannot grab these
+        except pygame.error:
+            self.enabled = False
+            return False
+        i = 0
+        for group, n in self.group_sizes.items():
+            self.groups[group] = deque(pygame.mixer.Channel(i + k) for k in range(n)); i += n
+        self.enabled = True
+        return True
+
+    # ---------- Loading ----------
+    def _read_cache(self, path, mtime, fmt):
+        hit = self.cache.read(path, mtime)
+        if hit is None or hit[0] != tuple(fmt): return None
+        try: return pygame.mixer.Sound(buffer=hit[1])
+        except pygame.error: return None
+
+    def _write_cache(self, path, mtime, fmt, sound):
+        try: pcm = sound.get_raw()
+        except pygame.error: return
+        self.cache.write(path, mtime, fmt, pcm)
+
+    def _load(self, eff):
+        path = resolve(self.base_dir, eff.names)
+        if path is None: return None
+        fmt = pygame.mixer.get_init()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            sound = self._read_cache(path, mtime, fmt) if self.use_disk_cache else None
+            if sound is not None:
+                self.disk_hits += 1
+            else:
+                sound = pygame.mixer.Sound(path); self.decodes += 1
+                if self.use_disk_cache: self._write_cache(path, mtime, fmt, sound)
+        except (OSError, pygame.error):
+            return None
+        sound.set_volume(eff.volume)
+        return sound
+
+    def preload(self, *names):
+        """Start the mixer and decode `names` (default: every effect) now rather than on first play."""
+        if self.enabled is None: self._start()
+        if not self.enabled: return
+        for name in names or self.effects:
+            eff = self.effects[name]
+            if eff.sound is None: eff.sound = self._load(eff) or False
+
+    # ---------- Playing ----------
+    def play(self, name):
+        """Start effect `name`, cutting its own or its group's oldest voice if there is no room."""
+        if self.enabled is None: self._start()
+        if not self.enabled: return
+        eff = self.effects.get(name)
+        if eff is None: return
+        sound = eff.sound
+        if sound is None: sound = eff.sound = self._load(eff) or False
+        if sound is False: return
+
+        # drop voices that finished or were taken over by another effect
+        voices = eff.voices = deque(c for c in eff.voices if c.get_sound() is sound)
+        group = self.groups[eff.group]
+        if len(voices) >= eff.limit:
+            ch = voices.popleft(); self.steals += 1
+        else:
+            ch = next((c for c in group if not c.get_busy()), None)
+            if ch is None:
+                ch = group[0]; self.steals += 1
+                if ch in voices: voices.remove(ch)
+        group.remove(ch); group.append(ch)
+        ch.play(sound)
+        voices.append(ch); self.plays += 1
+
+    def play_events(self, events):
+        """Play the effects named by a frame's (name, x, y) world events, each at most once per frame."""
+        played = set()
+        for name, _x, _y in events:
+            if name in self.effects and name not in played:
+                played.add(name); self.play(name)
@@ -0,0 +1,229 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+from multiprocessing import Pool
+
+import pygame
+
+import world as W
+from levels import LEVEL_DATA, MAX_LEVEL, compile_level
+
+# Balance runner. Plays many headless single-level games in a process pool, each
+# with a scripted bot and its own seed, over a grid of parameter settings, and
+# reports per (setting, level): win rate, time to boss, damage taken, gold earned.
+#
+#   python balance.py --runs 200
+#   python balance.py --set enemy_hp=30,45,60 --set price_heal=100,150 --levels 2,3 --out sweep.csv
+#
+# Settable: any per-level number in levels.json (enemy_hp, spawn_cd, enemy_speed,
+# enemy_bullet_chance, boss_hp, boss_exp), shop prices (price_double, price_speed,
+# price_heal) and drop_chance. Levels with a "waves" schedule ignore spawn_cd.
+#
+# enemy_speed moves enemies in whole pixels per tick: it is truncated (the shipped
+# 2.0, 2.4 and 2.8 all play as 2 px/tick). A sweep whose values truncate to the
+# same step would report identical games as different settings, so it is
+# rejected; fractional values are accepted with a warning.
+
+LEVEL_KEYS = ("enemy_hp", "spawn_cd", "enemy_speed", "enemy_bullet_chance", "boss_hp", "boss_exp")
+WORLD_KEYS = ("price_double", "price_speed", "price_heal", "drop_chance")
+SHOP_KEYS = {pygame.K_1: "double", pygame.K_2: "speed", pygame.K_3: "heal"}
+
+# ---------- Bots ----------
+HOME_X = 50   # where the bot parks when it is not chasing a pickup
+
+def evasive(world):
+    """autopilot, plus collecting pickups (EXP items are what bring the boss out) and
+    sidestepping enemy bullets that are about to reach the player."""
+    if world.game_state != W.STATE_PLAYING: return W.autopilot(world)
+    inputs = W.autopilot(world)
+    p = world.player
+    item = min(world.items, key=lambda it: abs(it.rect.centerx - p.centerx), default=None)
+    tx, ty = (item.rect.centerx, item.rect.centery) if item else (HOME_X + p.width // 2, None)
+    inputs.left = tx < p.centerx - 4; inputs.right = tx > p.centerx + 4
+    if ty is not None:
+        inputs.up = ty < p.centery - 4; inputs.down = ty > p.centery + 4
+    eb = world.enemy_bullets; n = eb.n
+    if n:
+        x = eb.x[:n]; y = eb.y[:n]; s = eb.size[:n]
+        near = (x < p.right + 90) & (x + s > p.left - 10) & (y + s > p.top - 12) & (y < p.bottom + 12)
+        if near.any():
+            below = float((y[near] + s[near] / 2).mean()) > p.centery
+            inputs.up = below and p.top > 0
+            inputs.down = not below and p.bottom < W.HEIGHT
+    return inputs
+
+POLICIES = {"autopilot": W.autopilot, "evasive": evasive}
+
+def with_shopping(policy, buy=("heal", "double", "speed")):
+    """Wrap a bot so it visits the shop from the level intro and buys what it can afford, in `buy` order."""
+    keys = {name: key for key, name in SHOP_KEYS.items()}
+    visited = []
+    def shopper(world):
+        if world.game_state == W.STATE_LEVEL_INTRO and not visited:
+            visited.append(world.level)
+            return W.Inputs(keys=(pygame.K_s,))
+        if world.game_state == W.STATE_SHOP:
+            for name in buy:
+                if world.player_gold >= world.shop_prices[name] and not _owned(world, name):
+                    return W.Inputs(keys=(keys[name],))
+            return W.Inputs(keys=(pygame.K_ESCAPE,))
+        return policy(world)
+    return shopper
+
+def _owned(world, name):
+    return (name == "double" and world.bullet_double) or (name == "speed" and world.bullet_fast) or \
+           (name == "heal" and world.player_hp >= W.PLAYER_MAX_HP)
+
+# ---------- One game ----------
+def play_level(level, params, seed, policy="evasive", shop=False, start_gold=0, max_seconds=300):
+    """Play one level from a fresh player until the boss dies, the player dies, or time runs out."""
+    raw = dict(LEVEL_DATA["levels"][level - 1])
+    raw.update({k: v for k, v in params.items() if k in LEVEL_KEYS})
+    world = W.GameWorld(save_path=None, seed=seed)
+    for name in ("double", "speed", "heal"):
+        if "price_" + name in params: world.shop_prices[name] = params["price_" + name]
+    if "drop_chance" in params: world.drop_chance = params["drop_chance"]
+    world.start_level(level)
+    world.cfg = compile_level(level, raw, LEVEL_DATA)
+    world.player_gold = start_gold
+
+    bot = POLICIES[policy]
+    if shop: bot = with_shopping(bot)
+    gold0 = world.player_gold; hp = world.player_hp
+    damage = 0; spent = 0; boss_tick = None; won = False; ticks = 0
+    for _ in range(int(max_seconds * W.FPS)):
+        g = world.player_gold
+        world.step(bot(world))
+        if world.player_gold < g: spent += g - world.player_gold   # only the shop takes gold
+        if world.player_hp < hp: damage += hp - world.player_hp
+        hp = world.player_hp
+        if world.game_state == W.STATE_PLAYING: ticks += 1
+        if boss_tick is None and world.boss is not None: boss_tick = ticks
+        if any(name == "boss_dead" for name, _x, _y in world.events): won = True; break
+        if world.game_state == W.STATE_GAME_OVER: break
+    world.close()
+    return {"level": level, "seed": seed, "won": won, "dead": world.game_state == W.STATE_GAME_OVER,
+            "seconds": ticks / W.FPS, "time_to_boss": None if boss_tick is None else boss_tick / W.FPS,
+            "damage": damage, "gold": world.player_gold - gold0 + spent}
+
+def _init_worker():
+    W.init_headless()
+
+def _job(job):
+    key, level, params, seed, opts = job
+    res = play_level(level, params, seed, **opts)
+    res["config"] = key
+    return res
+
+# ---------- Aggregation / report ----------
+def _mean(vals):
+    vals = [v for v in vals if v is not None]
+    return sum(vals) / len(vals) if vals else None
+
+def aggregate(results, configs):
+    rows = []
+    groups = {}
+    for r in results: groups.setdefault((r["config"], r["level"]), []).append(r)
+    for (key, level), rs in sorted(groups.items()):
+        row = {"config": key, "level": level}
+        row.update(configs[key])
+        row.update({
+            "runs": len(rs),
+            "win_rate": sum(r["won"] for r in rs) / len(rs),
+            "death_rate": sum(r["dead"] for r in rs) / len(rs),
+            "time_to_boss_s": _mean(r["time_to_boss"] for r in rs),
+            "boss_reached": sum(r["time_to_boss"] is not None for r in rs) / len(rs),
+            "clear_time_s": _mean(r["seconds"] for r in rs if r["won"]),
+            "damage": _mean(r["damage"] for r in rs),
+            "gold": _mean(r["gold"] for r in rs),
+        })
+        rows.append(row)
+    return rows
+
+def write_report(rows, path):
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f: json.dump(rows, f, indent=2)
+        return
+    fields = list(dict.fromkeys(k for row in rows for k in row))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields); w.writeheader(); w.writerows(rows)
+
+def _fmt(v):
+    if v is None: return "-"
+    return f"{v:.2f}" if isinstance(v, float) else str(v)
+
+def print_table(rows):
+    cols = ("config", "level", "runs", "win_rate", "death_rate", "boss_reached", "time_to_boss_s", "clear_time_s", "damage", "gold")
+    print("  ".join(f"{c:>14}" for c in cols))
+    for row in rows:
+        print("  ".join(f"{_fmt(row.get(c)):>14}" for c in cols))
+
+def check_enemy_speeds(values):
+    """Reject enemy_speed sweeps with values that play the same (see the header); warn about fractions."""
+    steps = {}
+    for v in values: steps.setdefault(int(v), []).append(v)
+    same = [vs for vs in steps.values() if len(vs) > 1]
+    if same:
+        raise SystemExit(f"enemy_speed is applied in whole px/tick; these values play identically: "
+                         + "; ".join(", ".join(map(str, vs)) for vs in same))
+    for v in values:
+        if v != int(v): print(f"warning: enemy_speed={v} plays as {int(v)} px/tick", file=sys.stderr)
+
+def parse_grid(sets):
+    """["enemy_hp=30,40", "drop_chance=0.5"] -> list of {name: value} settings (cartesian product)."""
+    axes = []
+    for item in sets or ():
+        name, _, values = item.partition("=")
+        if name not in LEVEL_KEYS + WORLD_KEYS: raise SystemExit(f"unknown parameter: {name}")
+        axes.append([(name, json.loads(v)) for v in values.split(",")])
+        if name == "enemy_speed": check_enemy_speeds([v for _, v in axes[-1]])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run many headless bot games in parallel and report balance stats")
+    ap.add_argument("--set", action="append", metavar="NAME=V1,V2,...", help="parameter values to sweep (repeatable; grid)")
+    ap.add_argument("--levels", default=",".join(str(i) for i in range(1, MAX_LEVEL + 1)), help="comma-separated levels")
+    ap.add_argument("--runs", type=int, default=50, help="games per (setting, level), seeds 0..runs-1 offset by --seed")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--policy", choices=sorted(POLICIES), default="evasive")
+    ap.add_argument("--shop", action="store_true", help="let the bot shop at each level intro")
+    ap.add_argument("--start-gold", type=int, default=0)
+    ap.add_argument("--max-seconds", type=float, default=300, help="game time limit per run")
+    ap.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    ap.add_argument("--out", help="write the report here (.csv or .json)")
+    args = ap.parse_args(argv)
+
+    grid = parse_grid(args.set)
+    configs = {f"c{i}": params for i, params in enumerate(grid)}
+    levels = [int(x) for x in args.levels.split(",")]
+    opts = {"policy": args.policy, "shop": args.shop, "start_gold": args.start_gold, "max_seconds": args.max_seconds}
+    jobs = [(key, lv, params, args.seed + i, opts)
+            for key, params in configs.items() for lv in levels for i in range(args.runs)]
+
+    t0 = time.perf_counter()
+    chunk = max(1, len(jobs) // (args.workers * 8))
+    if args.workers > 1:
+        # close()/join() rather than the context manager: its terminate() sends SIGTERM, which SDL
+        # in the workers turns into a quit event instead of exiting
+        pool = Pool(args.workers, initializer=_init_worker)
+        try:
+            results = list(pool.imap_unordered(_job, jobs, chunksize=chunk))
+        finally:
+            pool.close(); pool.join()
+    else:
+        _init_worker(); results = [_job(j) for j in jobs]
+    elapsed = time.perf_counter() - t0
+
+    rows = aggregate(results, configs)
+    print_table(rows)
+    print(f"\n{len(jobs)} games in {elapsed:.1f}s on {args.workers} workers")
+    if args.out:
+        write_report(rows, args.out); print(f"report written to {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pygame
+
+import world as W
+import new
+from entities import ITEM_TYPES
+from levels import LEVEL_DATA, compile_level
+
+# Frame-cost benchmarks. Each scenario is a synthetic play field with fixed counts
+# of bullets, enemy bullets, enemies and items (optionally the level's boss,
+# firing its boss_attack_pattern, and live particles). Every sample rebuilds that
+# field, then times each GameWorld.PLAY_PHASES step, the particle update and each
+# new.PLAY_LAYERS draw on an offscreen surface. Runs headless (SDL dummy driver); compares against a JSON baseline.
+#
+#   python bench.py                      # all scenarios, compare with bench_baseline.json
+#   python bench.py --save-baseline      # record this machine's numbers
+#   python bench.py -s boss-3 --enemy-bullets 5000 --samples 500
+
+BASELINE_PATH = "bench_baseline.json"
+
+SCENARIOS = {
+    "idle":  dict(level=1, bullets=10, enemy_bullets=10, enemies=3, items=2, boss=False),
+    "swarm": dict(level=2, bullets=300, enemy_bullets=600, enemies=80, items=40, boss=False),
+    "dense": dict(level=3, bullets=1000, enemy_bullets=4000, enemies=200, items=100, boss=False, particles=1500),
+}
+for _lv in range(1, W.MAX_LEVEL + 1):
+    SCENARIOS[f"boss-{_lv}"] = dict(level=_lv, bullets=200, enemy_bullets=800, enemies=0, items=20, boss=True)
+
+# Bullet-hell stress pattern (~2000 pellets/s, more below half HP), swapped in for the level's own
+HELL_PATTERN = [
+    {"hp": 1.0, "emitters": [
+        {"every": 4, "size": 8, "spiral": {"speed": 3.5, "arms": 6, "turn": 7}},
+        {"every": 20, "size": 10, "ring": {"speed": 2.5, "count": 36}},
+        {"every": 12, "size": 8, "aimed": {"speed": 6, "angles": [-10, -5, 0, 5, 10]}}]},
+    {"hp": 0.5, "emitters": [
+        {"every": 3, "size": 8, "spiral": {"speed": 4, "arms": 8, "turn": -9}},
+        {"every": 15, "size": 10, "ring": {"speed": 3, "count": 48, "offset": 3.75}},
+        {"every": 10, "size": 8, "aimed": {"speed": 7, "angles": [-15, -7.5, 0, 7.5, 15]}}]},
+]
+SCENARIOS["hell"] = dict(level=3, bullets=200, enemy_bullets=3000, enemies=0, items=10, boss=True, pattern=HELL_PATTERN,
+                         particles=2000)
+
+def level_with_pattern(level, phases):
+    """The level's config with its boss pattern replaced by `phases` (levels.json "boss_phases" form)."""
+    raw = dict(LEVEL_DATA["levels"][level - 1]); raw.pop("boss_pattern", None); raw["boss_phases"] = phases
+    return compile_level(level, raw, LEVEL_DATA)
+
+def populate(world, spec, rng, sample):
+    """Reset `world` to the scenario's play field. Not timed."""
+    world.clear_entities()
+    world.game_state = W.STATE_PLAYING
+    world.player_hp = W.PLAYER_MAX_HP
+    world.player.topleft = world.player_prev.topleft = (50, W.HEIGHT // 2)
+    cfg = world.cfg
+
+    # Player bullets stay left of the boss so one tick never kills it
+    k = spec["bullets"]
+    world.bullets.spawn_many(rng.uniform(0, W.WIDTH - 260, k), rng.uniform(0, W.HEIGHT - 10, k), 0, 0, 10)
+    k = spec["enemy_bullets"]
+    world.enemy_bullets.spawn_many(rng.uniform(0, W.WIDTH, k), rng.uniform(0, W.HEIGHT, k),
+                                   -5.0, rng.uniform(-2, 2, k), 8)
+    for _ in range(spec["enemies"]):
+        x = int(rng.integers(0, W.WIDTH - 40)); y = int(rng.integers(0, W.HEIGHT - 40))
+        world.enemies.append(world.enemy_pool.acquire().reset(x, y, cfg.enemy_hp, int(rng.integers(-1, 2))))
+    for _ in range(spec["items"]):
+        x = int(rng.integers(0, W.WIDTH - 20)); y = int(rng.integers(0, W.HEIGHT - 20))
+        world.items.append(world.item_pool.acquire().reset(x, y, ITEM_TYPES[int(rng.integers(0, len(ITEM_TYPES)))]))
+    if spec["boss"]:
+        world.boss = world.spawn_boss(); world.boss.timer = sample; world.boss_alive = True
+    else:
+        world.boss = None; world.boss_alive = False
+        world.player_exp = 0   # keep the boss from spawning mid-sample
+    parts = new.particles; parts.clear()
+    while len(parts) < spec.get("particles", 0):
+        parts.burst("enemy_dead", int(rng.integers(0, W.WIDTH)), int(rng.integers(0, W.HEIGHT)))
+
+def entity_count(spec):
+    return spec["bullets"] + spec["enemy_bullets"] + spec["enemies"] + spec["items"] + (1 if spec["boss"] else 0)
+
+def percentiles(samples_ns):
+    a = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    p50, p90, p99 = np.percentile(a, (50, 90, 99))
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(a.max())}
+
+def run_scenario(spec, samples=200, warmup=20, seed=1):
+    """Time update phases and draw layers for one scenario. Returns {phase: percentiles} plus totals."""
+    world = W.GameWorld(save_path=None, seed=seed)
+    world.start_level(spec["level"])
+    if spec.get("pattern"): world.cfg = level_with_pattern(spec["level"], spec["pattern"])
+    if spec.get("pixel_collision"): world.hit_masks = new.build_hit_masks()
+    rng = np.random.default_rng(seed)
+    inputs = W.Inputs(up=True)
+    bg = new.level_sprites(world).bg
+    phases = [("update." + name, getattr(world, "update_" + name)) for name in W.GameWorld.PLAY_PHASES]
+    layers = [("draw." + name, layer) for name, layer in new.PLAY_LAYERS]
+    times = {name: [] for name, _ in phases + layers}
+    times["update.particles"] = []; times["draw.background"] = []; times["update.total"] = []; times["draw.total"] = []
+    clock = time.perf_counter_ns; screen = new.screen
+
+    for i in range(warmup + samples):
+        populate(world, spec, rng, i)
+        record = i >= warmup
+        upd = 0
+        for name, fn in phases:
+            t0 = clock()
+            fn(inputs) if name == "update.movement" else fn()
+            dt = clock() - t0; upd += dt
+            if record: times[name].append(dt)
+        t0 = clock(); new.particles.update(1); dt = clock() - t0; upd += dt
+        if record: times["update.particles"].append(dt)
+        # drawing happens after the tick, on whatever the tick left behind
+        t0 = clock(); screen.blit(bg, (0, 0)); drw = clock() - t0
+        if record: times["draw.background"].append(drw)
+        for name, layer in layers:
+            t0 = clock()
+            layer(world)
+            dt = clock() - t0; drw += dt
+            if record: times[name].append(dt)
+        if record:
+            times["update.total"].append(upd); times["draw.total"].append(drw)
+    world.close()
+
+    result = {name: percentiles(ts) for name, ts in times.items()}
+    n = entity_count(spec)
+    result["entities"] = n
+    result["entities_per_ms"] = {"update": n / max(result["update.total"]["p50"], 1e-9),
+                                 "draw": n / max(result["draw.total"]["p50"], 1e-9)}
+    return result
+
+def compare(results, baseline, tolerance, min_ms):
+    """(scenario, phase, base p50, now p50) for every phase that got slower than the tolerance allows."""
+    regressions = []
+    for scen, res in results.items():
+        base = baseline.get(scen)
+        if not base: continue
+        for phase, stats in res.items():
+            if not isinstance(stats, dict) or "p50" not in stats or phase not in base: continue
+            was = base[phase]["p50"]; now = stats["p50"]
+            if max(was, now) < min_ms: continue   # below timer noise
+            if now > was * (1 + tolerance): regressions.append((scen, phase, was, now))
+    return regressions
+
+def print_report(name, spec, res):
+    print(f"\n== {name}: level {spec['level']}, {res['entities']} entities"
+          f" ({spec['bullets']} bullets, {spec['enemy_bullets']} enemy bullets, {spec['enemies']} enemies,"
+          f" {spec['items']} items{', boss' if spec['boss'] else ''}"
+          f"{', %d particles' % spec['particles'] if spec.get('particles') else ''})")
+    print(f"   {'phase':<20}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  ms")
+    for phase, st in res.items():
+        if isinstance(st, dict) and "p50" in st:
+            print(f"   {phase:<20}{st['p50']:>9.3f}{st['p90']:>9.3f}{st['p99']:>9.3f}{st['max']:>9.3f}")
+    eps = res["entities_per_ms"]
+    print(f"   entities/ms: update {eps['update']:.0f}, draw {eps['draw']:.0f}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Frame update/draw benchmarks on synthetic worlds")
+    ap.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="scenario(s) to run (default: all)")
+    for field in ("bullets", "enemy_bullets", "enemies", "items", "level"):
+        ap.add_argument("--" + field.replace("_", "-"), type=int, help=f"override {field} in every selected scenario")
+    ap.add_argument("--boss", choices=("on", "off"), help="override whether the boss is present")
+    ap.add_argument("--pixel-collision", action="store_true", help="collide with sprite masks (world.hit_masks)")
+    ap.add_argument("--samples", type=int, default=200)
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare with / write")
+    ap.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown per phase, as a fraction")
+    ap.add_argument("--min-ms", type=float, default=0.02, help="ignore phases faster than this (timer noise)")
+    ap.add_argument("--json", metavar="PATH", help="also write the full results here")
+    args = ap.parse_args(argv)
+
+    W.init_headless()
+    new.init_display(); new.load_assets()
+    new.screen = pygame.Surface((W.WIDTH, W.HEIGHT)).convert()   # offscreen; nothing is presented
+
+    results = {}
+    for name in args.scenario or list(SCENARIOS):
+        spec = dict(SCENARIOS[name])
+        for field in ("bullets", "enemy_bullets", "enemies", "items", "level"):
+            if getattr(args, field) is not None: spec[field] = getattr(args, field)
+        if args.boss: spec["boss"] = args.boss == "on"
+        if args.pixel_collision: spec["pixel_collision"] = True
+        results[name] = res = run_scenario(spec, args.samples, args.warmup, args.seed)
+        print_report(name, spec, res)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f: baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f: json.dump(baseline, f, indent=2)
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f: baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_ms)
+    for scen, phase, was, now in regressions:
+        print(f"REGRESSION {scen} {phase}: p50 {was:.3f} -> {now:.3f} ms (+{(now/was - 1)*100:.0f}%)")
+    if not regressions: print(f"\nno regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import pygame
+
+# Optional dirty-rectangle presentation. Each frame the caller lists the screen
+# areas it is about to draw; the renderer restores the background under those and
+# under last frame's areas, and presents only that union. When the dirty area
+# gets large a full flip is cheaper, so it falls back to one.
+
+class DirtyRectRenderer:
+    def __init__(self, size, threshold=0.4):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.threshold = threshold
+        self.prev = None           # areas drawn last frame; None forces a full redraw
+        self.static_key = None     # what the last static screen showed
+        self.full_frames = 0; self.dirty_frames = 0; self.idle_frames = 0
+
+    def invalidate(self):
+        self.prev = None; self.static_key = None
+
+    def static_unchanged(self, key):
+        """For screens where nothing moves: True if `key` matches what is already on screen."""
+        if key == self.static_key:
+            self.idle_frames += 1
+            return True
+        self.static_key = key; self.prev = None
+        return False
+
+    def begin(self, surface, background, rects):
+        """Restore `background` under last frame's and this frame's areas.
+
+        Returns the list to hand to present(), or None if the caller should redraw
+        and flip the whole screen instead.
+        """
+        self.static_key = None
+        clip = self.screen_rect.clip
+        cur = [c for c in (clip(r) for r in rects) if c.w and c.h]
+        prev = self.prev
+        self.prev = cur
+        if prev is None: return None
+        dirty = prev + cur
+        if sum(r.w * r.h for r in dirty) > self.threshold * self.screen_rect.w * self.screen_rect.h:
+            return None
+        for r in dirty: surface.blit(background, r, r)
+        return dirty
+
+    def present(self, dirty):
+        if dirty is None:
+            pygame.display.flip(); self.full_frames += 1
+        else:
+            pygame.display.update(dirty); self.dirty_frames += 1
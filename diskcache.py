@@ -0,0 +1,54 @@
+import os
+import struct
+import hashlib
+
+# Raw decode cache on disk, shared by the image and sound managers. Decoding a
+# PNG or an MP3/OGG costs far more than reading back the result, so each decoded
+# asset is written once as a small header (magic, the source file's mtime_ns, a
+# few format fields) followed by its raw bytes. An entry is only used while the
+# source file's mtime still matches; writes go through a temp file and rename so
+# an interrupted write never leaves half an entry behind.
+
+CACHE_DIR = ".asset_cache"
+
+def resolve(base_dir, names):
+    """The first of `names` (relative to `base_dir` unless absolute) that is an existing file, or None."""
+    for n in names:
+        p = n if os.path.isabs(n) else os.path.join(base_dir, n)
+        if os.path.isfile(p): return p
+    return None
+
+class RawCache:
+    """One kind of entry in `directory`: `magic` (4 bytes), then struct `fields` (e.g. "II"), then the payload.
+
+    Entries are keyed by the source's absolute path plus an optional `variant` (such as a scaled size).
+    Every failure reads as a miss or a skipped write; the cache is only ever a shortcut.
+    """
+
+    def __init__(self, directory, magic, fields, suffix):
+        self.directory = directory; self.magic = magic; self.suffix = suffix
+        self.header = struct.Struct("<4sq" + fields)
+
+    def path(self, source, variant=None):
+        key = os.path.abspath(source) if variant is None else f"{os.path.abspath(source)}|{variant}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + self.suffix)
+
+    def read(self, source, mtime, variant=None):
+        """(format fields, payload bytes) if there is an entry made from this version of `source`, else None."""
+        try:
+            with open(self.path(source, variant), "rb") as f: data = f.read()
+            magic, m, *fields = self.header.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != self.magic or m != mtime: return None
+        return tuple(fields), data[self.header.size:]
+
+    def write(self, source, mtime, fields, payload, variant=None):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            target = self.path(source, variant); tmp = target + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(self.header.pack(self.magic, mtime, *fields)); f.write(payload)
+            os.replace(tmp, target)
+        except OSError:
+            pass
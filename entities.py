@@ -0,0 +1,77 @@
+import pygame
+
+# Entity records and the systems that update them. Enemies, items and the boss
+# are small __slots__ classes: fixed fields, no per-instance dict, attribute
+# access instead of dict lookups. Projectiles are not records at all; they live
+# column-wise in ProjectileStore. Behaviour is written as system functions that
+# make one pass over a homogeneous list, not as per-entity methods.
+
+ITEM_TYPES = ("heal", "exp", "speed", "double")
+
+class Enemy:
+    __slots__ = ("rect", "hp", "vy", "px", "py", "alive")
+
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, 40, 40)
+        self.hp = 0; self.vy = 0; self.px = 0; self.py = 0; self.alive = False
+
+    def reset(self, x, y, hp, vy):
+        self.rect.update(x, y, 40, 40); self.px = x; self.py = y
+        self.hp = hp; self.vy = vy; self.alive = True
+        return self
+
+class Item:
+    __slots__ = ("rect", "type", "px", "py", "alive")
+
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, 20, 20)
+        self.type = "heal"; self.px = 0; self.py = 0; self.alive = False
+
+    def reset(self, x, y, kind):
+        self.rect.update(x, y, 20, 20); self.px = x; self.py = y
+        self.type = kind; self.alive = True
+        return self
+
+class Boss:
+    __slots__ = ("rect", "hp", "timer", "vy", "px", "py")
+
+    def __init__(self, x, y, size, hp, vy):
+        self.rect = pygame.Rect(x, y, size, size)
+        self.hp = hp; self.timer = 0; self.vy = vy; self.px = x; self.py = y
+
+# ---------- Systems ----------
+def move_enemies(enemies, step, height, rng, chance):
+    """Advance every enemy one tick (bouncing off the top/bottom edges) and roll its shot.
+
+    Enemies that leave the left edge are marked dead. Returns the (xs, ys) muzzle
+    positions of the enemies that fire this tick, in list order.
+    """
+    xs = []; ys = []
+    for e in enemies:
+        r = e.rect
+        e.px = r.x; e.py = r.y
+        r.x -= step
+        r.y += e.vy
+        if r.top <= 0 or r.bottom >= height: e.vy = -e.vy
+        if rng.random() < chance:
+            xs.append(r.x); ys.append(r.centery)
+        if r.right < 0: e.alive = False
+    return xs, ys
+
+def fall_items(items, height):
+    """Drop live items one pixel; those that fall off the bottom are marked dead."""
+    for it in items:
+        if not it.alive: continue
+        r = it.rect
+        it.px = r.x; it.py = r.y
+        r.y += 1
+        if r.top > height: it.alive = False
+
+def move_boss(boss, stop_x, height):
+    """Slide the boss in until `stop_x`, bob vertically, and advance its attack timer."""
+    boss.timer += 1
+    r = boss.rect
+    boss.px = r.x; boss.py = r.y
+    if r.x > stop_x: r.x -= 1
+    r.y += boss.vy
+    if r.top <= 0 or r.bottom >= height: boss.vy = -boss.vy
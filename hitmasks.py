@@ -0,0 +1,53 @@
+import numpy as np
+import pygame
+
+# Optional pixel-accurate hit testing. Entities keep their small gameplay rects for
+# movement and the broad phase; with a HitMasks attached to the world, a hit also
+# needs the drawn sprites to overlap: first their bounding boxes (the sprite is
+# drawn at the entity rect's top-left), then their pygame.mask bitmaps.
+#
+# Masks are built once per (image, size) by AssetManager.mask() and handed over
+# here; nothing is built per frame. Bullets are solid squares, whose masks are
+# cached per size.
+
+class HitShape:
+    """A sprite's mask, placed at the owning rect's top-left."""
+    __slots__ = ("mask", "w", "h")
+
+    def __init__(self, mask):
+        self.mask = mask; self.w, self.h = mask.get_size()
+
+    def bounds(self, topleft):
+        return pygame.Rect(topleft, (self.w, self.h))
+
+    def overlaps(self, topleft, other, other_topleft):
+        """Pixel test against another shape; call only once the bounds overlap."""
+        return self.mask.overlap(other.mask, (other_topleft[0] - topleft[0], other_topleft[1] - topleft[1])) is not None
+
+class HitMasks:
+    """Shapes for the player and, per level, enemies and the boss. `enemy`/`boss` map level -> HitShape
+    (e.g. assets.LazyImages, so a level's masks are only built when it is played)."""
+
+    def __init__(self, player, enemy, boss):
+        self.player = player; self.enemy = enemy; self.boss = boss
+        self._squares = {}
+
+    def square(self, size):
+        m = self._squares.get(size)
+        if m is None: m = self._squares[size] = pygame.mask.Mask((size, size), fill=True)
+        return m
+
+    def bullets_hitting(self, store, shape, topleft):
+        """Ascending indices of live projectiles in `store` touching `shape` drawn at `topleft`."""
+        idx = store.overlapping(shape.bounds(topleft))
+        if not len(idx): return idx
+        x0, y0 = topleft; overlap = shape.mask.overlap
+        xs = np.floor(store.x[idx]).astype(np.int64).tolist(); ys = np.floor(store.y[idx]).astype(np.int64).tolist()
+        sizes = store.size[idx].astype(np.int64).tolist()
+        keep = [k for k, (x, y, s) in enumerate(zip(xs, ys, sizes))
+                if overlap(self.square(s), (x - x0, y - y0)) is not None]
+        return idx[keep]
+
+    def box_touches(self, shape, topleft, box):
+        """Pixel test of a solid square `box` (a Rect) against `shape` drawn at `topleft`; call once the bounds overlap."""
+        return shape.mask.overlap(self.square(box.w), (box.x - topleft[0], box.y - topleft[1])) is not None
@@ -0,0 +1,109 @@
+import math
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from world import Inputs
+
+# Input pipeline. SDL's queue is drained (pump()) more than once a frame: at the
+# top of the loop and again right after the frame is presented, so input arriving
+# while a frame is drawn is picked up then instead of after the frame cap's
+# sleep. Every drain is stamped, and take() spreads what came in over the
+# simulation ticks the frame runs: input stamped inside a tick's slice of real
+# time is applied before that tick rather than before the first one, which
+# matters when a slow frame runs several ticks at once.
+#
+# Latency: the stamps of discrete presses are kept until presented() is called
+# after the frame that includes them reaches the screen; the difference is
+# recorded as that input's input-to-present latency. Time an event spends in
+# SDL's queue before a drain is not visible here (at most the frame cap's sleep).
+
+# What ends an idle wait: anything a scene reacts to, or the window needing a repaint.
+# Mouse motion and the like are drained but go back to sleep.
+WAKE_EVENTS = frozenset((pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+                         pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE))
+
+class InputBuffer:
+    """`auto_fire`: report SPACE held down as Inputs.fire (the world rate-limits the shots).
+    `driver_keys`: presses the caller handles itself; they never reach take()'s Inputs or the latency stats."""
+
+    def __init__(self, auto_fire=True, window=240, driver_keys=()):
+        self.auto_fire = auto_fire
+        self.driver_keys = frozenset(driver_keys)
+        self.driver_presses = []   # driver keys pressed since the last take_driver_presses()
+        self.pending = []          # (stamp, held, keys, clicks, quit) per drain that saw something new
+        self.held = (False,) * 5   # left, right, up, down, fire as of the last drain
+        self.applied = self.held   # held state the last take() ended with
+        self.unpresented = []      # stamps of presses already taken, not yet on screen
+        self.latency = deque(maxlen=window)   # seconds, most recent presses
+        self.presses = 0
+        self.exposed = False       # the window asked to be repainted; the caller clears this
+
+    def pump(self, wait_ms=0):
+        """Drain SDL's queue. With `wait_ms`, first sleep until one of WAKE_EVENTS arrives or the timeout
+        passes, unless input from an earlier drain is still waiting for take()."""
+        events = pygame.event.get()
+        if wait_ms and not self.pending and not self.driver_presses and not any(e.type in WAKE_EVENTS for e in events):
+            deadline = time.perf_counter() + wait_ms / 1000
+            while (left := int((deadline - time.perf_counter()) * 1000)) > 0:
+                first = pygame.event.wait(left)
+                if first.type == pygame.NOEVENT: break
+                events = [first] + pygame.event.get()
+                if any(e.type in WAKE_EVENTS for e in events): break
+        stamp = time.perf_counter()
+        keys = []; clicks = []; quit_ = False
+        for event in events:
+            if event.type == pygame.QUIT: quit_ = True
+            elif event.type == pygame.KEYDOWN:
+                (self.driver_presses if event.key in self.driver_keys else keys).append(event.key)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1: clicks.append(event.pos)
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE): self.exposed = True
+        k = pygame.key.get_pressed()
+        held = (k[pygame.K_LEFT], k[pygame.K_RIGHT], k[pygame.K_UP], k[pygame.K_DOWN],
+                self.auto_fire and k[pygame.K_SPACE])
+        if keys or clicks or quit_ or held != self.held:
+            self.pending.append((stamp, held, keys, clicks, quit_))
+        self.held = held
+        return bool(events)
+
+    def take(self, n, end, tick):
+        """Everything drained since the last take(), split over a frame's `n` ticks as [(Inputs, ticks), ...].
+
+        The ticks simulate real time up to `end` (a perf_counter() value), `tick` seconds each. The
+        ticks always add up to `n`; with n = 0 there is a single 0-tick step so presses still apply.
+        """
+        pending = self.pending; self.pending = []
+        steps = []; start = 0
+        held = self.applied; keys = []; clicks = []; quit_ = False
+        for stamp, h, k, c, q in pending:
+            i = n - 1 - math.floor((end - stamp) / tick) if n else 0
+            i = min(max(i, 0), max(n - 1, 0))
+            if i > start:
+                steps.append((Inputs(*held[:4], keys, clicks, quit_, held[4]), i - start))
+                keys = []; clicks = []; quit_ = False; start = i
+            held = h; keys += k; clicks += c; quit_ = quit_ or q
+            if k or c: self.unpresented.extend([stamp] * (len(k) + len(c)))
+        steps.append((Inputs(*held[:4], keys, clicks, quit_, held[4]), n - start))
+        self.applied = held
+        return steps
+
+    def take_driver_presses(self):
+        """Driver keys pressed since the last call, in order."""
+        taken = self.driver_presses; self.driver_presses = []
+        return taken
+
+    def presented(self):
+        """Call once a frame has reached the screen: every press taken so far is now visible."""
+        if not self.unpresented: return
+        now = time.perf_counter()
+        self.latency.extend(now - s for s in self.unpresented)
+        self.presses += len(self.unpresented); self.unpresented.clear()
+
+    def stats(self):
+        """Input-to-present latency over the recent window, in ms."""
+        if not self.latency: return {}
+        ms = np.array(self.latency) * 1000
+        return {"presses": self.presses, "mean_ms": float(ms.mean()), "p50_ms": float(np.percentile(ms, 50)),
+                "p95_ms": float(np.percentile(ms, 95)), "max_ms": float(ms.max())}
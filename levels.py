@@ -0,0 +1,65 @@
+import os
+import json
+
+from patterns import compile_pattern
+
+# Level definitions live in levels.json. Each level is compiled when it is first
+# needed (started, or preloaded ahead of time) into an immutable LevelConfig (numbers, spawn timeline, boss
+# pattern with velocities already worked out, see patterns.py) so the frame loop
+# only reads plain attributes.
+
+LEVELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.json")
+
+class LevelConfig:
+    """Compiled, read-only settings for one level."""
+    __slots__ = (
+        "number", "era", "enemy_hp", "spawn_cd", "enemy_speed", "enemy_step", "enemy_bullet_chance",
+        "boss_hp", "boss_exp", "lanes", "enemy_vy", "boss_vy", "spawn_gaps", "boss_pattern",
+        "enemy_img", "boss_img", "boss_img_size", "background", "bg_color",
+    )
+
+    def __init__(self, **fields):
+        for k in self.__slots__: object.__setattr__(self, k, fields[k])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LevelConfig is read-only")
+
+def compile_level(number, raw, defaults):
+    # Wave schedule: frame gaps between spawns, cycled; defaults to one enemy every spawn_cd.
+    waves = raw.get("waves") or [{"cd": raw["spawn_cd"]}]
+    gaps = tuple(int(w["cd"]) for w in waves for _ in range(int(w.get("count", 1))))
+    return LevelConfig(
+        number=number, era=raw.get("era", ""),
+        enemy_hp=raw["enemy_hp"], spawn_cd=raw["spawn_cd"], enemy_speed=raw["enemy_speed"],
+        enemy_step=int(raw["enemy_speed"]), enemy_bullet_chance=raw["enemy_bullet_chance"],
+        boss_hp=raw["boss_hp"], boss_exp=raw.get("boss_exp", 20),
+        lanes=tuple(raw.get("lanes", defaults["lanes"])), enemy_vy=tuple(raw.get("enemy_vy", defaults["enemy_vy"])),
+        boss_vy=tuple(raw.get("boss_vy", defaults["boss_vy"])), spawn_gaps=gaps,
+        boss_pattern=compile_pattern(raw),
+        enemy_img=raw.get("enemy_img"), boss_img=raw.get("boss_img"), boss_img_size=raw.get("boss_img_size", 170),
+        background=raw.get("background"), bg_color=tuple(raw.get("bg_color", (0, 0, 0))),
+    )
+
+def load_level_data(path=LEVELS_PATH):
+    with open(path, "r", encoding="utf-8") as f: return json.load(f)
+
+LEVEL_DATA = load_level_data()
+MAX_LEVEL = len(LEVEL_DATA["levels"])
+ERA_NAMES = {i: raw.get("era", "") for i, raw in enumerate(LEVEL_DATA["levels"], start=1)}
+_compiled = {}
+
+def level_config(lv):
+    """Compiled config for level `lv` (clamped to the known levels); compiled on first use, then shared."""
+    lv = min(max(lv, 1), MAX_LEVEL)
+    cfg = _compiled.get(lv)
+    if cfg is None:
+        cfg = _compiled[lv] = compile_level(lv, LEVEL_DATA["levels"][lv-1], LEVEL_DATA)
+    return cfg
+
+def level_compiled(lv):
+    """True if level `lv`'s config is compiled (and so anything built from it may be loaded)."""
+    return lv in _compiled
+
+def unload_level(lv):
+    """Forget level `lv`'s compiled config; it is compiled again if needed."""
+    _compiled.pop(lv, None)
@@ -1,696 +1,709 @@
 import pygame
 import sys
-import random
-import math
-import os
-import json
-
-pygame.init()
-WIDTH, HEIGHT = 800, 400
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("橫向射擊遊戲：闖關版")
-clock = pygame.time.Clock()
+import argparse
+import time
+import gc
+from itertools import repeat
+
+import numpy as np
+
+from world import (
+    WIDTH, HEIGHT, FPS, FRAME_DT, PLAYER_MAX_HP, SHOP_PRICES, ERA_NAMES, MAX_LEVEL, AUTO_FIRE_TICKS,
+    STATE_MENU, STATE_LEVEL_SELECT, STATE_LEVEL_INTRO, STATE_PLAYING, STATE_SHOP,
+    STATE_GAME_OVER, STATE_VICTORY,
+    GameWorld, level_config, init_headless, run_headless, menu_button_rects, menu_quit_rect, level_card_rects,
+)
+from textcache import render_text
+from dirtyrects import DirtyRectRenderer
+from assets import AssetManager, LazyImages
+from audio import SoundManager
+from particles import ParticleSystem
+from hitmasks import HitMasks, HitShape
+from preload import LevelPreloader
+from quality import LEVELS, QUALITY_NAMES, QualityGovernor
+from inputs import InputBuffer
+from levels import level_compiled, unload_level
+from replay import InputRecorder, Recording, state_digest
+from profiler import FrameProfiler, LOOP_SECTIONS, COUNTERS
+
+screen = None; clock = None
+level_loader = None
+hit_masks = None   # HitMasks from build_hit_masks(), whose per-level shapes unload with the level
 
 # ---------- Assets ----------
 ASSET_DIR = "."
-def load_image_try(*names, size=None, fallback_color=(200, 0, 0)):
-    for n in names:
-        try:
-            img = pygame.image.load(n).convert_alpha()
-            if size: img = pygame.transform.scale(img, size)
-            return img
-        except Exception:
-            continue
-    surf = pygame.Surface(size if size else (40, 40), pygame.SRCALPHA)
-    surf.fill(fallback_color)
-    return surf
-
-class _Silent:
-    def play(self): pass
-    def set_volume(self, v): pass
+assets = None
 
-def load_sound_try(*names):
-    for n in names:
-        try: return pygame.mixer.Sound(n)
-        except Exception: continue
-    return _Silent()
-
-# Sounds (silent fallbacks if missing)
-shoot_sound = load_sound_try("Sound/shoot4.mp3", os.path.join(ASSET_DIR, "shoot4.mp3")); shoot_sound.set_volume(0.4)
-enemy_dead_sound = load_sound_try("Sound/enemy die.mp3", os.path.join(ASSET_DIR, "enemy die.mp3")); enemy_dead_sound.set_volume(0.5)
+sounds = None; particles = None
+PARTICLE_BUDGET = 2048   # hard cap on live particles; bursts recycle the oldest
+# Reserved mixer channels per group: rapid fire cannot cut off kill sounds
+SOUND_GROUPS = {"player": 4, "enemy": 6}
 
 # Fonts & colors
 WHITE=(255,255,255); BLACK=(0,0,0); RED=(255,0,0); GREEN=(0,255,0); YELLOW=(255,255,0)
-font = pygame.font.SysFont(None, 24); big_font = pygame.font.SysFont(None, 56); title_font = pygame.font.SysFont(None, 72)
-
-# Game states
-STATE_MENU="menu"; STATE_LEVEL_SELECT="level_select"
-STATE_LEVEL_INTRO="level_intro"; STATE_PLAYING="playing"; STATE_SHOP="shop"
-STATE_GAME_OVER="game_over"; STATE_VICTORY="victory"
-
-# Player
-player = pygame.Rect(50, HEIGHT-60, 40, 40)
-PLAYER_MAX_HP = 10
-player_speed_base = 5
-player_hp = PLAYER_MAX_HP
-player_exp = 0
-player_gold = 0
-bullet_speed_base = 7
-bullet_double = False; bullet_double_timer = 0
-bullet_fast = False; bullet_fast_timer = 0
-
-# Entities
-bullets = []; enemy_bullets = []; enemies = []; items = []
-enemy_spawn_timer = 0
-
-# Era & progression
-ERA_NAMES = {1:"Prehistoric Era", 2:"Dutch Rule", 3:"Japanese Rule"}
-level = 1; MAX_LEVEL = 3; level_intro_timer = 0
-
-def level_params(lv):
-    return {
-        1: {"enemy_hp":30, "spawn_cd":60, "enemy_speed":2.0, "enemy_bullet_chance":0.010, "boss_hp":220},
-        2: {"enemy_hp":42, "spawn_cd":50, "enemy_speed":2.4, "enemy_bullet_chance":0.014, "boss_hp":280},
-        3: {"enemy_hp":56, "spawn_cd":40, "enemy_speed":2.8, "enemy_bullet_chance":0.018, "boss_hp":340},
-    }[min(max(lv,1),3)]
-
-# Images
-player_img = load_image_try("hero.png", os.path.join(ASSET_DIR, "hero.png"), size=(70, 70))
-ENEMY_IMAGES = {
-    1: load_image_try("原始人.png", os.path.join(ASSET_DIR, "原始人.png"), size=(70,70)),
-    2: load_image_try("荷蘭人.png", os.path.join(ASSET_DIR, "荷蘭人.png"), size=(70,70)),
-    3: load_image_try("日本人.png", os.path.join(ASSET_DIR, "日本人.png"), size=(70,70)),
-}
-BOSS_IMAGES = {
-    1: load_image_try("原始人.png", os.path.join(ASSET_DIR, "原始人.png"), size=(170,170)),
-    2: load_image_try("荷蘭人.png", os.path.join(ASSET_DIR, "荷蘭人.png"), size=(180,180)),
-    3: load_image_try("日本人.png", os.path.join(ASSET_DIR, "日本人.png"), size=(190,190)),
-}
-BG_IMAGES = {
-    1: load_image_try("bg_level1.png", os.path.join(ASSET_DIR, "bg_level1.png"), size=(WIDTH, HEIGHT), fallback_color=(120,90,60)),
-    2: load_image_try("bg_level2.png", os.path.join(ASSET_DIR, "bg_level2.png"), size=(WIDTH, HEIGHT), fallback_color=(120,170,210)),
-    3: load_image_try("bg_level3.png", os.path.join(ASSET_DIR, "bg_level3.png"), size=(WIDTH, HEIGHT), fallback_color=(230,200,200)),
-}
-MENU_BG = load_image_try("menu_bg.png", os.path.join(ASSET_DIR, "menu_bg.png"), size=(WIDTH, HEIGHT), fallback_color=(20,20,40))
-
-# Boss
-boss = None; boss_alive = False
-
-# Items (shop images are optional; if missing, simple squares are used)
-item_images = {
-    "heal": pygame.image.load("Image/power/heal.png"),
-    "speed": pygame.image.load("Image/power/speed.png"),
-    "double": pygame.image.load("Image/power/double.png"),
-    "exp": pygame.image.load("Image/power/exp.png"),
-}
-for k in item_images:
-    item_images[k] = pygame.transform.scale(item_images[k], (20, 20))
-
-# 商店圖片
-shop_images = {
-    "speed": pygame.image.load("Image/power/speed.png"),
-    "double": pygame.image.load("Image/power/double.png"),
-    "heal": pygame.image.load("Image/power/heal.png"),
-}
-
-# Save/Load
-SAVE_PATH = "savegame.json"
-def save_game(max_unlocked, gold=0):
-    data = {"max_unlocked": int(max_unlocked), "gold": int(gold)}
-    try:
-        with open(SAVE_PATH, "w", encoding="utf-8") as f: json.dump(data, f)
-        return True
-    except Exception as e:
-        print("Save failed:", e); return False
-
-def load_game():
-    if not os.path.exists(SAVE_PATH): return {"max_unlocked": 1, "gold": 0}
-    try:
-        with open(SAVE_PATH, "r", encoding="utf-8") as f: data = json.load(f)
-        if not isinstance(data, dict): raise ValueError("Bad format")
-        return {"max_unlocked": int(data.get("max_unlocked", 1)), "gold": int(data.get("gold", 0))}
-    except Exception as e:
-        print("Load failed:", e); return {"max_unlocked": 1, "gold": 0}
-
-save_data = load_game()
-
-# Helpers
-def reset_player():
-    global player, player_hp, player_exp
-    player.x, player.y = 50, HEIGHT-60
-    player_hp = PLAYER_MAX_HP
-    player_exp = 0
-
-def clear_entities():
-    bullets.clear(); enemy_bullets.clear(); enemies.clear(); items.clear()
-
-def start_level(lv):
-    global level, level_intro_timer, boss, boss_alive, game_state
-    level = lv; clear_entities(); reset_player()
-    boss = None; boss_alive = False
-    level_intro_timer = 90; game_state = STATE_LEVEL_INTRO
-
-def spawn_enemy():
-    y = random.choice([HEIGHT-60, HEIGHT-160, HEIGHT-260])
-    vy = random.choice([-1, 0, 1])
-    return {"rect": pygame.Rect(WIDTH, y, 40, 40), "hp": level_params(level)["enemy_hp"], "vy": vy}
-
-def spawn_boss():
-    hp = level_params(level)["boss_hp"]; vy = random.choice([-2,-1,1,2])
-    return {"rect": pygame.Rect(WIDTH-220, HEIGHT//2-80, 160, 160), "hp": hp, "timer": 0, "vy": vy}
-
-def draw_hp_bar(x, y, current, max_value, width=120, height=12):
-    pygame.draw.rect(screen, RED, (x, y, width, height))
-    ratio = max(0, current/max_value)
-    pygame.draw.rect(screen, GREEN, (x, y, int(width*ratio), height))
-
-def spawn_enemy_bullet(x, y, vx, vy, size=8):
-    enemy_bullets.append({"rect": pygame.Rect(x, y, size, size), "vx": vx, "vy": vy})
-
-def boss_attack_pattern(b):
-    t = b["timer"]; bx, by = b["rect"].centerx, b["rect"].centery
-    if level == 1:
-        if t % 18 == 0: spawn_enemy_bullet(bx-20, by, -6, 0, size=12)
-    elif level == 2:
-        if t % 36 == 0:
-            for vy in (-2,0,2): spawn_enemy_bullet(bx-20, by, -6.5, vy, size=10)
-    elif level == 3:
-        if t % 30 == 0:
-            for ang_deg in (-30,-15,0,15,30):
-                ang = math.radians(ang_deg)
-                vx = -7 * math.cos(ang); vy = 7 * math.sin(ang)
-                spawn_enemy_bullet(bx-20, by, vx, vy, size=10)
-
-def handle_shop_keydown(key):
-    global bullet_fast, bullet_fast_timer, bullet_double, bullet_double_timer, player_hp, player_gold, game_state
-    if key == pygame.K_1 and player_gold >= 200: bullet_fast=True; bullet_fast_timer=300; player_gold-=200; save_game(save_data.get("max_unlocked",1), player_gold)
-    elif key == pygame.K_2 and player_gold >= 300: bullet_double=True; bullet_double_timer=300; player_gold-=300; save_game(save_data.get("max_unlocked",1), player_gold)
-    elif key == pygame.K_3 and player_gold >= 150: player_hp=min(PLAYER_MAX_HP, player_hp+3); player_gold-=150; save_game(save_data.get("max_unlocked",1), player_gold)
-    elif key == pygame.K_ESCAPE: game_state = STATE_PLAYING
-
-def next_level_or_victory():
-    global level, game_state, save_data
-    if level >= MAX_LEVEL:
-        game_state = STATE_VICTORY
-    else:
-        level += 1
-        if save_data.get("max_unlocked", 1) < level:
-            save_data["max_unlocked"] = level
-            save_data["gold"] = player_gold
-            save_game(save_data["max_unlocked"], save_data["gold"])
-        start_level(level)
-
-def reset_full_game():
-    global level, player_gold, bullet_double, bullet_double_timer, bullet_fast, bullet_fast_timer, game_state
-    level = 1; player_gold = 0
-    bullet_double = False; bullet_double_timer = 0
-    bullet_fast = False; bullet_fast_timer = 0
-    start_level(level)
+ITEM_COLORS = {"heal": (0,200,0), "speed": (0,120,255), "double": (255,160,0), "exp": (180,0,255)}
+
+# Render quality in effect (quality.LEVELS); main() hands control to a QualityGovernor
+quality = LEVELS[0]; quality_label = LEVELS[0].name
+
+def init_display():
+    global screen, clock
+    # not pygame.init(): the mixer is started by SoundManager when the first sound plays
+    pygame.display.init(); pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("橫向射擊遊戲：闖關版")
+    clock = pygame.time.Clock()
+
+def load_assets():
+    global sounds, particles, font, small_font, big_font, title_font
+    global assets, level_loader, player_img, ENEMY_IMAGES, BOSS_IMAGES, BG_IMAGES, MENU_BG, item_images, shop_icons, hud, prof_overlay
+
+    # Sounds, keyed by world event name (silent if missing); main() preloads them once the first frame is up
+    sounds = SoundManager(ASSET_DIR, SOUND_GROUPS)
+    sounds.add("shoot", "Sound/shoot4.mp3", "shoot4.mp3", volume=0.4, group="player", limit=3)
+    sounds.add("enemy_dead", "Sound/enemy die.mp3", "enemy die.mp3", volume=0.5, group="enemy", limit=4)
+    particles = ParticleSystem(PARTICLE_BUDGET, (WIDTH, HEIGHT))
+    for color in particles.palette:   # every sprite a particle can shrink through, so the first burst does not stall
+        for size in range(1, particles.max_size + 1): solid(color, (size, size))
+
+    font = pygame.font.SysFont(None, 24); small_font = pygame.font.SysFont(None, 16); big_font = pygame.font.SysFont(None, 56); title_font = pygame.font.SysFont(None, 72)
+    hud = HudLayer(); prof_overlay = ProfilerOverlay()
+
+    # Images: only what the first menu frame needs is loaded up front; level art loads on first use
+    assets = AssetManager(ASSET_DIR)
+    MENU_BG = assets.image("menu_bg.png", size=(WIDTH, HEIGHT), fallback_color=(20,20,40))
+    player_img = assets.image("hero.png", size=(70, 70), atlas=True)
+
+    # Items (shop images are optional; if missing, simple squares are used)
+    item_images = {
+        "heal": assets.image("Image/power/heal.png", size=(20, 20), fallback_color=ITEM_COLORS["heal"], atlas=True),
+        "speed": assets.image("Image/power/speed.png", size=(20, 20), fallback_color=ITEM_COLORS["speed"], atlas=True),
+        "double": assets.image("Image/power/double.png", size=(20, 20), fallback_color=ITEM_COLORS["double"], atlas=True),
+        "exp": assets.image("Image/power/exp.png", size=(20, 20), fallback_color=ITEM_COLORS["exp"], atlas=True),
+    }
+    # 商店圖片 (pre-scaled to the card icon size)
+    shop_icons = {
+        "speed": assets.image("Image/power/speed.png", size=(60, 60), fallback_color=(0,120,255), atlas=True),
+        "double": assets.image("Image/power/double.png", size=(60, 60), fallback_color=(255,160,0), atlas=True),
+        "heal": assets.image("Image/power/heal.png", size=(60, 60), fallback_color=(0,200,0), atlas=True),
+    }
+    assets.end_batch()
+
+    # Level art: prepared in the background ahead of each level (see preload.py); a lookup of a
+    # level that was not prefetched loads it on the spot. Not atlased, since levels get unloaded.
+    ENEMY_IMAGES = LazyImages({n: _art_loader(n, 0) for n in range(1, MAX_LEVEL+1)})
+    BOSS_IMAGES = LazyImages({n: _art_loader(n, 1) for n in range(1, MAX_LEVEL+1)})
+    BG_IMAGES = LazyImages({n: _art_loader(n, 2) for n in range(1, MAX_LEVEL+1)})
+    level_loader = LevelPreloader(prepare_level, install_level, unload_level_art, MAX_LEVEL)
+
+# ---------- Level art ----------
+def level_art(lv):
+    """(table, file names, size, fallback colour) of each image level `lv` draws."""
+    c = level_config(lv)
+    return ((ENEMY_IMAGES, (c.enemy_img,), (70, 70), (200, 0, 0)),
+            (BOSS_IMAGES, (c.boss_img,), (c.boss_img_size,)*2, (200, 0, 0)),
+            (BG_IMAGES, (c.background,), (WIDTH, HEIGHT), c.bg_color))
+
+def _art_loader(lv, i):
+    def load():
+        _table, names, size, fallback = level_art(lv)[i]
+        return assets.image(*names, size=size, fallback_color=fallback)
+    return load
+
+def prepare_level(lv):
+    """Worker thread: compile the level's config, decode and scale its art."""
+    return [assets.prepare(*names, size=size) for _table, names, size, _fallback in level_art(lv)]
+
+def install_level(lv, prepared):
+    for (table, _names, _size, fallback), prep in zip(level_art(lv), prepared):
+        table.put(lv, assets.install(prep, fallback))
+
+def unload_level_art(lv):
+    # everything a level loads goes through level_art(), so nothing is loaded without a compiled config
+    if not level_compiled(lv): return
+    for table, names, size, _fallback in level_art(lv):
+        table.drop(lv); assets.forget(*names, size=size)
+    if hit_masks is not None:
+        hit_masks.enemy.drop(lv); hit_masks.boss.drop(lv)
+    unload_level(lv)
+
+def preload_levels(world):
+    """Start on the next level once this one's boss is out (and on Continue's level while the menu
+    is up); install finished work."""
+    if world.game_state == STATE_MENU:
+        level_loader.prefetch(min(world.save_data.get("max_unlocked", 1), MAX_LEVEL))
+    elif any(name == "boss_spawn" for name, _x, _y in world.events):
+        level_loader.prefetch(world.level + 1)
+    level_loader.poll()
+
+def build_hit_masks():
+    """Collision shapes for --pixel-collision, from the same scaled sprites the draw layers blit."""
+    global hit_masks
+    def level_shape(lv, i):
+        def build():
+            _table, names, size, _fallback = level_art(lv)[i]
+            return HitShape(assets.mask(*names, size=size))
+        return build
+    hit_masks = HitMasks(HitShape(assets.mask("hero.png", size=(70, 70))),
+                         LazyImages({n: level_shape(n, 0) for n in range(1, MAX_LEVEL+1)}),
+                         LazyImages({n: level_shape(n, 1) for n in range(1, MAX_LEVEL+1)}))
+    return hit_masks
+
+def play_event_sounds(world):
+    sounds.play_events(world.events)
+
+def update_particles(world, ticks):
+    """Burst effects for this step's world events, then advance particles by the ticks that ran."""
+    particles.emit_events(world.events)
+    if world.game_state == STATE_PLAYING: particles.update(ticks)   # frozen behind the shop / end screens
 
 # ---------- Menu / UI helpers ----------
-def draw_menu_bg():
-    screen.blit(MENU_BG, (0,0))
-
-def button(rect, text, enabled=True, subtext=None):
+def draw_hp_bar(x, y, current, max_value, width=120, height=12, surf=None):
+    surf = surf or screen
+    pygame.draw.rect(surf, RED, (x, y, width, height))
+    ratio = max(0, current/max_value)
+    pygame.draw.rect(surf, GREEN, (x, y, int(width*ratio), height))
+
+class HudLayer:
+    """HP bar + EXP/Gold/Level/quality texts, composited into one surface only when the values change."""
+
+    def __init__(self, size=(WIDTH//2, 104)):
+        self.surf = pygame.Surface(size, pygame.SRCALPHA)
+        self.key = None; self.bounds = pygame.Rect(0, 0, 0, 0)
+        self.rebuilds = 0
+
+    def refresh(self, world):
+        key = (world.player_hp, world.player_exp, world.player_gold, world.level, quality_label)
+        if key != self.key:
+            self.key = key; self.rebuilds += 1
+            hp, exp, gold, level, qlabel = key
+            s = self.surf; s.fill((0, 0, 0, 0))
+            draw_hp_bar(10, 10, hp, PLAYER_MAX_HP, width=120, height=12, surf=s)
+            s.blit(render_text(font, f"EXP: {exp}", WHITE), (10, 30))
+            s.blit(render_text(font, f"Gold: {gold}", WHITE), (10, 50))
+            s.blit(render_text(font, f"Level: {level}/{MAX_LEVEL} - {ERA_NAMES.get(level,'')}", WHITE), (10, 70))
+            s.blit(render_text(small_font, f"Quality: {qlabel}", WHITE), (10, 90))
+            self.bounds = s.get_bounding_rect()
+
+    def draw(self, target, world):
+        self.refresh(world)
+        target.blit(self.surf, (0, 0))
+
+class ProfilerOverlay:
+    """F3 overlay: stacked frame-time graph of the loop sections plus timings and entity counts.
+
+    The text block is re-rendered a few times a second; the graph every frame.
+    """
+    COLORS = {"events": (120, 120, 255), "update": (255, 90, 90), "effects": (255, 255, 120),
+              "draw": (90, 220, 90), "present": (90, 220, 220), "wait": (70, 70, 70)}
+
+    def __init__(self, rect=(WIDTH - 250, 4, 246, 146), frames=120, scale_ms=33.3, text_every=15):
+        self.rect = pygame.Rect(rect)
+        self.surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self.text = pygame.Surface((self.rect.w, 74), pygame.SRCALPHA)
+        self.frames = frames; self.scale_ms = scale_ms; self.text_every = text_every
+        self.visible = False; self._tick = 0
+        self.inputs = None   # inputs.InputBuffer whose input-to-present latency is shown
+
+    def _refresh_text(self, prof):
+        st = prof.summary(); t = self.text; t.fill((0, 0, 0, 0))
+        if not st: return
+        lines = (f"frame {st['frame_ms']:.2f} ms  p99 {st['p99_ms']:.2f}  max {st['max_ms']:.2f}",
+                 "  ".join(f"{n[:3]} {st[n]:.2f}" for n in LOOP_SECTIONS if n != "wait"),
+                 "  ".join(f"{n[:3]} {st[n]:.2f}" for n in prof.sections[len(LOOP_SECTIONS):]),
+                 "  ".join(f"{n} {st[n]}" for n in COUNTERS).replace("enemy_bullets", "ebul"))
+        lat = self.inputs.stats() if self.inputs is not None else {}
+        if lat: lines += (f"input lag p50 {lat['p50_ms']:.1f}  p95 {lat['p95_ms']:.1f}  max {lat['max_ms']:.1f}",)
+        for i, line in enumerate(lines):
+            t.blit(small_font.render(line, True, WHITE), (4, 2 + 14 * i))
+
+    def draw(self, target, prof):
+        if self._tick % self.text_every == 0: self._refresh_text(prof)
+        self._tick += 1
+        s = self.surf; s.fill((0, 0, 0, 170 if quality.overlay_alpha else 255))
+        s.blit(self.text, (0, 0))
+        gh = self.rect.h - 78; base = self.rect.h - 2; px_per_ms = gh / self.scale_ms
+        rows = prof.recent(self.frames); x = self.rect.w - 2 * len(rows)
+        for r in rows:
+            y = base
+            for i, name in enumerate(LOOP_SECTIONS):
+                h = prof.dur[r, i] / 1e6 * px_per_ms
+                if h >= 0.5:
+                    y2 = max(base - gh, y - h)
+                    pygame.draw.line(s, self.COLORS[name], (x, y), (x, y2), 2); y = y2
+            x += 2
+        y60 = base - int(1000 / FPS * px_per_ms)
+        pygame.draw.line(s, (255, 255, 255, 120), (0, y60), (self.rect.w, y60))
+        target.blit(s, self.rect)
+
+def button(rect, text, enabled=True, subtext=None, surf=None):
     # Card-style button with shadow
+    surf = surf or screen
     shadow = rect.move(0, 4)
-    pygame.draw.rect(screen, (0,0,0,80), shadow, border_radius=14)
-    pygame.draw.rect(screen, (245, 245, 245) if enabled else (210,210,210), rect, border_radius=14)
-    pygame.draw.rect(screen, (40,40,40), rect, 2, border_radius=14)
-    label = big_font.render(text, True, (30,30,35) if enabled else (120,120,120))
-    screen.blit(label, (rect.centerx - label.get_width()//2, rect.centery - label.get_height()//2))
+    pygame.draw.rect(surf, (0,0,0,80), shadow, border_radius=14)
+    pygame.draw.rect(surf, (245, 245, 245) if enabled else (210,210,210), rect, border_radius=14)
+    pygame.draw.rect(surf, (40,40,40), rect, 2, border_radius=14)
+    label = render_text(big_font, text, (30,30,35) if enabled else (120,120,120))
+    surf.blit(label, (rect.centerx - label.get_width()//2, rect.centery - label.get_height()//2))
     if subtext:
-        s = font.render(subtext, True, (90,90,100))
-        screen.blit(s, (rect.centerx - s.get_width()//2, rect.bottom + 8))
+        s = render_text(font, subtext, (90,90,100))
+        surf.blit(s, (rect.centerx - s.get_width()//2, rect.bottom + 8))
     return rect
 
-def label_center(text, y, font_obj=None, color=WHITE):
+def label_center(text, y, font_obj=None, color=WHITE, surf=None):
     f = font_obj or title_font
-    surf = f.render(text, True, color)
-    screen.blit(surf, (WIDTH//2 - surf.get_width()//2, y))
+    label = render_text(f, text, color)
+    (surf or screen).blit(label, (WIDTH//2 - label.get_width()//2, y))
+
+# ---------- Draw ----------
+def lerp_pos(ent, alpha):
+    """Draw position of an entity record, `alpha` of the way from its last tick to this one."""
+    r = ent.rect
+    if alpha >= 1.0: return r.topleft
+    return (int(ent.px + (r.x - ent.px) * alpha), int(ent.py + (r.y - ent.py) * alpha))
+
+def draw_alpha(world):
+    """Interpolation factor to draw with: only live play moves between ticks."""
+    return world.timestep.alpha if world.game_state == STATE_PLAYING else 1.0
+
+# ---------- Batched sprites ----------
+class LevelSprites:
+    """The enemy, boss and background images of one level, looked up once per level change."""
+    __slots__ = ("level", "enemy", "boss", "bg")
+
+    def __init__(self, level):
+        self.level = level
+        self.enemy = ENEMY_IMAGES.get(level) or ENEMY_IMAGES.first()
+        self.boss = BOSS_IMAGES.get(level) or BOSS_IMAGES.first()
+        self.bg = BG_IMAGES.get(level) or BG_IMAGES.first()
+
+_level_sprites = None
+
+def level_sprites(world):
+    global _level_sprites
+    if _level_sprites is None or _level_sprites.level != world.level:
+        level_loader.activate(world.level)   # swaps in the preloaded level, unloads older ones
+        _level_sprites = LevelSprites(world.level)
+    return _level_sprites
+
+_solids = {}
+
+def solid(color, size):
+    """A pre-filled opaque sprite; blitting it paints exactly what draw.rect(color, size) would."""
+    key = (color, size)
+    surf = _solids.get(key)
+    if surf is None:
+        surf = _solids[key] = pygame.Surface(size).convert(); surf.fill(color)
+    return surf
 
-# ---------- Autosave timer ----------
-autosave_counter = 0
+def draw_player(world, alpha=1.0):
+    p, pp = world.player, world.player_prev
+    screen.blit(player_img, (int(pp.x + (p.x - pp.x) * alpha), int(pp.y + (p.y - pp.y) * alpha)))
+
+def draw_enemies(world, alpha=1.0):
+    enemies = world.enemies
+    if not enemies: return
+    img = level_sprites(world).enemy; enemy_hp = world.cfg.enemy_hp
+    red = solid(RED, (40, 5)); green = solid(GREEN, (40, 5))
+    if not quality.hp_bars:
+        screen.blits([(img, lerp_pos(e, alpha)) for e in enemies], doreturn=False)
+        return
+    seq = []
+    for e in enemies:
+        x, y = pos = lerp_pos(e, alpha)
+        # sprite, then its small HP bar (green part clipped to the remaining HP)
+        seq += ((img, pos), (red, (x, y - 8)), (green, (x, y - 8), (0, 0, int(40 * e.hp/enemy_hp), 5)))
+    screen.blits(seq, doreturn=False)
+
+def draw_bullets(world, alpha=1.0):
+    for store, color in ((world.bullets, WHITE), (world.enemy_bullets, YELLOW)):
+        if not len(store): continue
+        corners, sizes = store.corners(alpha)
+        lo = int(sizes.min()); hi = int(sizes.max())
+        if lo == hi:   # usual case: one sprite for the whole batch
+            screen.blits(zip(repeat(solid(color, (lo, lo))), corners), doreturn=False)
+        else:
+            sprites = {s: solid(color, (s, s)) for s in np.unique(sizes).tolist()}
+            screen.blits(zip(map(sprites.__getitem__, sizes.tolist()), corners), doreturn=False)
+
+def draw_items(world, alpha=1.0):
+    if not world.items: return
+    images = item_images if quality.item_sprites else {k: solid(c, (20, 20)) for k, c in ITEM_COLORS.items()}
+    screen.blits([(images[it.type], lerp_pos(it, alpha)) for it in world.items if it.type in images],
+                 doreturn=False)
+
+def draw_boss(world, alpha=1.0):
+    boss = world.boss
+    if not boss: return
+    level = world.level
+    screen.blit(level_sprites(world).boss, lerp_pos(boss, alpha))
+    # boss HP bar
+    pygame.draw.rect(screen, RED, (300, 20, 220, 15))
+    pygame.draw.rect(screen, GREEN, (300, 20, int(220 * boss.hp/world.cfg.boss_hp), 15))
+    screen.blit(render_text(font, f"BOSS - {ERA_NAMES.get(level,'')}", BLACK), (300, 0))
+
+def draw_particles(world, alpha=1.0):
+    if not len(particles): return
+    pos, sizes, colors = particles.visible()
+    if not pos: return
+    keys = (colors * 256 + sizes).tolist()
+    palette = particles.palette
+    sprites = {k: solid(palette[k >> 8], (k & 255, k & 255)) for k in set(keys)}
+    screen.blits(zip(map(sprites.__getitem__, keys), pos), doreturn=False)
+
+def draw_hud(world, alpha=1.0):
+    hud.draw(screen, world)
+
+# Bottom to top; the benchmark harness times these one by one.
+PLAY_LAYERS = (("player", draw_player), ("enemies", draw_enemies), ("bullets", draw_bullets),
+               ("items", draw_items), ("boss", draw_boss), ("particles", draw_particles), ("hud", draw_hud))
+
+def draw_play_layer(world, alpha=1.0):
+    """Everything in play that sits on top of the level background."""
+    for _name, layer in PLAY_LAYERS:
+        layer(world, alpha)
+
+# ---------- Baked screens ----------
+class BakedScreen:
+    """A surface composed once by `build(key)` and rebuilt only when `key` changes."""
+
+    def __init__(self, build):
+        self.build = build
+        self.key = None; self.surf = None
+        self.builds = 0
+
+    def get(self, key=()):
+        if self.surf is None or key != self.key:
+            self.key = key; self.surf = self.build(key); self.builds += 1
+        return self.surf
+
+def _opaque_screen(bg):
+    s = pygame.Surface((WIDTH, HEIGHT)).convert()
+    s.blit(bg, (0, 0))
+    return s
+
+def build_menu(_key):
+    s = _opaque_screen(MENU_BG)
+    rects = menu_button_rects()
+    button(rects[0], "Continue (Enter)", surf=s)
+    button(rects[1], "Level Select (L)", surf=s)
+    button(rects[2], "New Game (N)", surf=s)
+    # Quit area
+    q_rect = menu_quit_rect()
+    pygame.draw.rect(s, (245,245,245), q_rect, border_radius=12)
+    pygame.draw.rect(s, (40,40,40), q_rect, 2, border_radius=12)
+    q_lbl = render_text(font, "Quit (Q)", (30,30,35)); s.blit(q_lbl, (q_rect.centerx - q_lbl.get_width()//2, q_rect.centery - q_lbl.get_height()//2))
+    return s
+
+def build_level_select(key):
+    (unlocked,) = key
+    s = _opaque_screen(MENU_BG)
+    label_center("Select Level", 36, title_font, WHITE, surf=s)
+    lock = None
+    for i, rect in enumerate(level_card_rects()):
+        enabled = (i+1) <= unlocked
+        # draw card
+        shadow = rect.move(0,4); pygame.draw.rect(s, (0,0,0,80), shadow, border_radius=14)
+        color = (245,245,245) if enabled else (210,210,210)
+        pygame.draw.rect(s, color, rect, border_radius=14)
+        pygame.draw.rect(s, (40,40,40), rect, 2, border_radius=14)
+        title = render_text(big_font, f"Level {i+1}", (30,30,35) if enabled else (120,120,120))
+        era = render_text(font, ERA_NAMES.get(i+1,""), (50,50,60) if enabled else (130,130,130))
+        s.blit(title, (rect.centerx - title.get_width()//2, rect.y + 22))
+        s.blit(era, (rect.centerx - era.get_width()//2, rect.y + 22 + title.get_height() + 6))
+        if not enabled:
+            # lock overlay
+            if lock is None: lock = pygame.Surface(rect.size, pygame.SRCALPHA); lock.fill((100,100,100,90))
+            s.blit(lock, rect.topleft)
+    tip = render_text(font, f"Click a level (or press 1-{MAX_LEVEL}). ESC to menu.", (210,210,220))
+    s.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT - 60))
+    return s
+
+# (shop image key, label, price); keys 1-3 in this order, matching GameWorld.handle_shop_keydown
+SHOP_CARDS = (("double", "Double", SHOP_PRICES["double"]), ("speed", "Speed", SHOP_PRICES["speed"]),
+              ("heal", "Heal +3", SHOP_PRICES["heal"]))
+
+def build_shop_panel(_key):
+    s = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    # Title
+    shop_text = render_text(big_font, "[SHOP]", WHITE)
+    s.blit(shop_text, (WIDTH // 2 - shop_text.get_width() // 2, 20))
+    y_base = 90
+    for i, (img_key, name, price) in enumerate(SHOP_CARDS):
+        card_rect = pygame.Rect(WIDTH // 2 - 180, y_base + i * 100, 360, 90)
+        pygame.draw.rect(s, (230, 230, 230), card_rect, border_radius=12)
+        pygame.draw.rect(s, BLACK, card_rect, 2, border_radius=12)
+        s.blit(shop_icons[img_key], (card_rect.x + 15, card_rect.y + 15))
+        name_text = render_text(font, f"{i+1}. {name}", BLACK)
+        price_text = render_text(font, f"{price} $$", (120, 70, 0))
+        s.blit(name_text, (card_rect.x + 90, card_rect.y + 25))
+        s.blit(price_text, (card_rect.x + 90, card_rect.y + 50))
+    exit_text = render_text(font, "(ESC to close)", BLACK)
+    s.blit(exit_text, (WIDTH // 2 - exit_text.get_width() // 2, y_base + len(SHOP_CARDS) * 100 + 20))
+    return s
+
+def build_level_intro(key):
+    (level,) = key
+    s = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA); s.fill((255,255,255,170))
+    intro = render_text(big_font, f"Level {level} - {ERA_NAMES.get(level,'')}", BLACK)
+    tip = render_text(font, "Press any key to start (S = Shop)", BLACK)
+    s.blit(intro, (WIDTH//2 - intro.get_width()//2, HEIGHT//2 - 40))
+    s.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT//2 + 10))
+    return s
+
+menu_screen = BakedScreen(build_menu)
+level_select_screen = BakedScreen(build_level_select)
+shop_panel = BakedScreen(build_shop_panel)
+level_intro_overlay = BakedScreen(build_level_intro)
+
+# ---------- Scene drawing (one function per game state, see world.SCENES) ----------
+def draw_menu(world, alpha=1.0):
+    screen.blit(menu_screen.get(), (0,0))
+
+def draw_level_select(world, alpha=1.0):
+    screen.blit(level_select_screen.get((world.save_data.get("max_unlocked", 1),)), (0,0))
+
+def draw_playing(world, alpha=1.0):
+    screen.blit(level_sprites(world).bg, (0,0))
+    draw_play_layer(world, alpha)
+
+def draw_level_intro(world, alpha=1.0):
+    draw_playing(world, alpha)
+    screen.blit(level_intro_overlay.get((world.level,)), (0,0))
+
+def draw_shop(world, alpha=1.0):
+    draw_playing(world, alpha)
+    screen.blit(shop_panel.get(), (0,0))
+
+# Game over / victory draw over whatever the last play frame left on screen
+def draw_game_over(world, alpha=1.0):
+    label_center("Game Over", HEIGHT//2 - 40, big_font, RED)
+    tip = render_text(font, "R: Restart   Q/Esc: Quit", WHITE)
+    screen.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT//2 + 10))
+
+def draw_victory(world, alpha=1.0):
+    label_center("Victory!", HEIGHT//2 - 60, big_font, GREEN)
+    tip = render_text(font, "R: Restart   Q/Esc: Quit", WHITE)
+    screen.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT//2 - 10))
+
+SCENE_DRAW = {
+    STATE_MENU: draw_menu, STATE_LEVEL_SELECT: draw_level_select, STATE_LEVEL_INTRO: draw_level_intro,
+    STATE_PLAYING: draw_playing, STATE_SHOP: draw_shop, STATE_GAME_OVER: draw_game_over, STATE_VICTORY: draw_victory,
+}
 
-# ---------- Boot to main menu ----------
-game_state = STATE_MENU
-selected_from_menu = False  # flag to prevent double triggers
+def draw(world, alpha=1.0):
+    SCENE_DRAW[world.game_state](world, alpha)
+
+def play_rects(world, alpha=1.0):
+    """Screen areas draw_play_layer() will touch this frame (for the dirty-rect renderer)."""
+    p, pp = world.player, world.player_prev
+    rects = [pygame.Rect(int(pp.x + (p.x - pp.x) * alpha), int(pp.y + (p.y - pp.y) * alpha), 70, 70)]
+    for e in world.enemies:
+        x, y = lerp_pos(e, alpha)
+        rects.append(pygame.Rect(x, y - 8, 70, 78))
+    rects += [pygame.Rect(x, y, s, s) for x, y, s in world.bullets.boxes(alpha)]
+    rects += [pygame.Rect(x, y, s, s) for x, y, s in world.enemy_bullets.boxes(alpha)]
+    rects += [pygame.Rect(lerp_pos(it, alpha), (20, 20)) for it in world.items]
+    if world.boss:
+        rects.append(level_sprites(world).boss.get_rect(topleft=lerp_pos(world.boss, alpha)))
+        rects.append(pygame.Rect(300, 0, 220, 35))
+    if len(particles):
+        pos, sizes, _colors = particles.visible()
+        rects += [pygame.Rect(x, y, s, s) for (x, y), s in zip(pos, sizes.tolist())]
+    hud.refresh(world)
+    rects.append(hud.bounds.copy())
+    return rects
+
+_shown_static = None   # static_key() of the static scene last flipped to the screen, if any
+
+def static_key(world, prof=None):
+    """Everything a screen where nothing moves (menus, intro, shop, game over) depends on."""
+    key = (world.game_state, world.level, world.player_hp, world.player_gold, world.save_data.get("max_unlocked", 1),
+           quality_label)
+    if prof is not None and prof_overlay.visible: key += (prof.frames,)
+    return key
+
+def invalidate_static(dirty=None):
+    """The screen no longer shows what was drawn last (e.g. the window was exposed): redraw it all."""
+    global _shown_static
+    _shown_static = None
+    if dirty: dirty.invalidate()
+
+def render_frame(world, dirty=None, prof=None):
+    """Draw and present one frame; with a DirtyRectRenderer only what changed is redrawn.
+    A static scene is only redrawn when its static_key() changes.
+
+    With a FrameProfiler, drawing and presenting are charged to separate sections and
+    the F3 overlay is drawn on top when visible.
+    """
+    global _shown_static
+    alpha = draw_alpha(world)
+    overlay = prof is not None and prof_overlay.visible
+    if dirty is None:
+        key = static_key(world, prof) if world.scene.static else None
+        if key is not None and key == _shown_static: return
+        _shown_static = key
+        draw(world, alpha)
+        if overlay: prof_overlay.draw(screen, prof)
+        if prof is not None: prof.lap("draw")
+        pygame.display.flip()
+    elif world.game_state == STATE_PLAYING:
+        bg = level_sprites(world).bg
+        rects = play_rects(world, alpha)
+        if overlay: rects.append(prof_overlay.rect.copy())
+        rects = dirty.begin(screen, bg, rects)
+        if rects is None: draw(world, alpha)
+        else: draw_play_layer(world, alpha)
+        if overlay: prof_overlay.draw(screen, prof)
+        if prof is not None: prof.lap("draw")
+        dirty.present(rects)
+    else:
+        # menus, intro, shop, game over: nothing moves, so only redraw when what they show changes
+        if dirty.static_unchanged(static_key(world, prof)): return
+        draw(world)
+        if overlay: prof_overlay.draw(screen, prof)
+        if prof is not None: prof.lap("draw")
+        dirty.present(None)
+    if prof is not None: prof.lap("present")
 
 # ---------- Main loop ----------
-# ---------- Main loop ----------
-while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            # autosave on quit
-            save_game(max(save_data.get("max_unlocked",1), level), player_gold)
-            pygame.quit(); sys.exit()
-
-        if event.type == pygame.KEYDOWN:
-            if game_state == STATE_MENU:
-                if event.key in (pygame.K_RETURN, pygame.K_c):
-                    # Continue from highest unlocked
-                    target = max(1, min(save_data.get("max_unlocked",1), MAX_LEVEL))
-                    start_level(target)
-                elif event.key in (pygame.K_n,):
-                    # New game from level 1
-                    save_data["max_unlocked"] = 1; save_data["gold"] = 0; save_game(1,0)
-                    start_level(1)
-                elif event.key in (pygame.K_l,):
-                    game_state = STATE_LEVEL_SELECT
-                elif event.key in (pygame.K_q, pygame.K_ESCAPE):
-                    save_game(max(save_data.get("max_unlocked",1), level), player_gold)
-                    pygame.quit(); sys.exit()
-
-            elif game_state == STATE_LEVEL_SELECT:
-                if event.key == pygame.K_ESCAPE:
-                    game_state = STATE_MENU
-                elif event.key in (pygame.K_1, pygame.K_2, pygame.K_3):
-                    lv = int(event.unicode)
-                    if lv <= save_data.get("max_unlocked",1):
-                        start_level(lv)
-
-            elif game_state == STATE_LEVEL_INTRO:
-                # allow S to visit shop before start
-                if event.key == pygame.K_s:
-                    game_state = STATE_SHOP
-                else:
-                    # any key starts
-                    game_state = STATE_PLAYING
-
-            elif game_state == STATE_PLAYING:
-                if event.key == pygame.K_SPACE:
-                    shoot_sound.play()
-                    b = pygame.Rect(player.right, player.centery-5, 10, 10)
-                    bullets.append(b)
-                    if bullet_double:
-                        b2 = pygame.Rect(player.right, player.centery+10, 10, 10)
-                        bullets.append(b2)
-                elif event.key == pygame.K_s:
-                    game_state = STATE_SHOP
-                elif event.key == pygame.K_F5:
-                    max_unlocked = max(save_data.get("max_unlocked", 1), level)
-                    if save_game(max_unlocked, player_gold):
-                        save_data["max_unlocked"] = max_unlocked
-                        save_data["gold"] = player_gold
-                elif event.key == pygame.K_F9:
-                    save_data = load_game()
-
-            elif game_state == STATE_SHOP:
-                if event.key == pygame.K_1 and player_gold >= 300:
-                    bullet_double = True
-                    bullet_double_timer = 300
-                    player_gold -= 300
-                elif event.key == pygame.K_2 and player_gold >= 200:
-                    bullet_fast = True
-                    bullet_fast_timer = 300
-                    player_gold -= 200
-                elif event.key == pygame.K_3 and player_gold >= 150:
-                    player_hp = min(PLAYER_MAX_HP, player_hp + 3)
-                    player_gold -= 150
-                elif event.key == pygame.K_ESCAPE:
-                    game_state = STATE_PLAYING
-
-            elif game_state in (STATE_GAME_OVER, STATE_VICTORY):
-                if event.key == pygame.K_r: reset_full_game()
-                elif event.key in (pygame.K_q, pygame.K_ESCAPE): 
-                    save_game(max(save_data.get("max_unlocked",1), level), player_gold)
-                    pygame.quit(); sys.exit()
-
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            mx, my = event.pos
-            if game_state == STATE_MENU:
-                # click buttons
-                bw, bh = 360, 64
-                gap = 26
-                start_y = HEIGHT//2 - (bh*3 + gap*2)//2
-                rects = [
-                    pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*0, bw, bh),  # Continue
-                    pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*1, bw, bh),  # Level Select
-                    pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*2, bw, bh),  # New Game
-                ]
-                labels = ["Continue", "Level Select", "New Game"]
-                for i, r in enumerate(rects):
-                    if r.collidepoint(mx, my):
-                        if i == 0:
-                            target = max(1, min(save_data.get("max_unlocked",1), MAX_LEVEL))
-                            start_level(target)
-                        elif i == 1:
-                            game_state = STATE_LEVEL_SELECT
-                        elif i == 2:
-                            save_data["max_unlocked"] = 1; save_data["gold"] = 0; save_game(1,0)
-                            start_level(1)
-                # Quit text zone
-                q_rect = pygame.Rect(WIDTH//2-120, HEIGHT-56, 240, 40)
-                if q_rect.collidepoint(mx,my):
-                    save_game(max(save_data.get("max_unlocked",1), level), player_gold)
-                    pygame.quit(); sys.exit()
-
-            elif game_state == STATE_LEVEL_SELECT:
-                # Level cards
-                bw, bh = 200, 120
-                spacing = 40
-                total_w = bw*3 + spacing*2
-                start_x = WIDTH//2 - total_w//2
-                y = HEIGHT//2 - bh//2
-                unlocked = save_data.get("max_unlocked", 1)
-                for i in range(3):
-                    rect = pygame.Rect(start_x + i*(bw+spacing), y, bw, bh)
-                    if i+1 <= unlocked and rect.collidepoint(mx, my):
-                        start_level(i+1)
-
-    # --- 畫面更新 ---
-    if game_state == STATE_SHOP:
-        shop_items = [
-            {"img": shop_images["double"], "name": "Double", "price": 300, "key": "1"},
-            {"img": shop_images["speed"], "name": "Speed", "price": 200, "key": "2"},
-            {"img": shop_images["heal"], "name": "Heal +3", "price": 150, "key": "3"},
-        ]
-        shop_text = big_font.render("[SHOP]", True, WHITE)
-        screen.blit(shop_text, (WIDTH // 2 - shop_text.get_width() // 2, 20))
-        y_base = 90
-        for i, item in enumerate(shop_items):
-            card_rect = pygame.Rect(WIDTH // 2 - 180, y_base + i * 100, 360, 90)
-            pygame.draw.rect(screen, (230, 230, 230), card_rect, border_radius=12)
-            pygame.draw.rect(screen, BLACK, card_rect, 2, border_radius=12)
-
-            img = pygame.transform.scale(item["img"], (60, 60))
-            screen.blit(img, (card_rect.x + 15, card_rect.y + 15))
-
-            name_text = font.render(f"{item['key']}. {item['name']}", True, BLACK)
-            price_text = font.render(f"{item['price']} $$", True, (120, 70, 0))
-            screen.blit(name_text, (card_rect.x + 90, card_rect.y + 25))
-            screen.blit(price_text, (card_rect.x + 90, card_rect.y + 50))
-
-        exit_text = font.render("(ESC 離開)", True, BLACK)
-        screen.blit(exit_text, (WIDTH // 2 - exit_text.get_width() // 2, y_base + len(shop_items) * 100 + 20))
-
- 
-    elif game_state in (STATE_GAME_OVER, STATE_VICTORY):
-                if event.key == pygame.K_r: reset_full_game()
-                elif event.key in (pygame.K_q, pygame.K_ESCAPE): save_game(max(save_data.get("max_unlocked",1), level), player_gold); pygame.quit(); sys.exit()
-
-    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            mx, my = event.pos
-            if game_state == STATE_MENU:
-                # click buttons
-                bw, bh = 360, 64
-                gap = 26
-                start_y = HEIGHT//2 - (bh*3 + gap*2)//2
-                rects = [
-                    pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*0, bw, bh),  # Continue
-                    pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*1, bw, bh),  # Level Select
-                    pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*2, bw, bh),  # New Game
-                ]
-                labels = ["Continue", "Level Select", "New Game"]
-                for i, r in enumerate(rects):
-                    if r.collidepoint(mx, my):
-                        if i == 0:
-                            target = max(1, min(save_data.get("max_unlocked",1), MAX_LEVEL))
-                            start_level(target)
-                        elif i == 1:
-                            game_state = STATE_LEVEL_SELECT
-                        elif i == 2:
-                            save_data["max_unlocked"] = 1; save_data["gold"] = 0; save_game(1,0)
-                            start_level(1)
-                # Quit text zone
-                q_rect = pygame.Rect(WIDTH//2-120, HEIGHT-56, 240, 40)
-                if q_rect.collidepoint(mx,my):
-                    save_game(max(save_data.get("max_unlocked",1), level), player_gold)
-                    pygame.quit(); sys.exit()
-
-            elif game_state == STATE_LEVEL_SELECT:
-                # Level cards
-                bw, bh = 200, 120
-                spacing = 40
-                total_w = bw*3 + spacing*2
-                start_x = WIDTH//2 - total_w//2
-                y = HEIGHT//2 - bh//2
-                unlocked = save_data.get("max_unlocked", 1)
-                for i in range(3):
-                    rect = pygame.Rect(start_x + i*(bw+spacing), y, bw, bh)
-                    if i+1 <= unlocked and rect.collidepoint(mx, my):
-                        start_level(i+1)
-
-    # ---------- Updates ----------
-    if game_state == STATE_LEVEL_INTRO:
-        level_intro_timer -= 1
-        if level_intro_timer <= 0:
-            game_state = STATE_PLAYING
-
-    if game_state == STATE_PLAYING:
-        keys = pygame.key.get_pressed(); spd = player_speed_base
-        if keys[pygame.K_LEFT]  and player.left  > 0:     player.x -= spd
-        if keys[pygame.K_RIGHT] and player.right < WIDTH: player.x += spd
-        if keys[pygame.K_UP]    and player.top   > 0:     player.y -= spd
-        if keys[pygame.K_DOWN]  and player.bottom< HEIGHT:player.y += spd
-
-        # Player bullets
-        speed = bullet_speed_base*(2 if bullet_fast else 1)
-        for b in bullets[:]:
-            b.x += speed
-            if b.right > WIDTH: bullets.remove(b)
-
-        # Spawn enemies
-        enemy_spawn_timer += 1
-        if not boss_alive:
-            if enemy_spawn_timer > level_params(level)["spawn_cd"] and boss is None:
-                enemies.append(spawn_enemy()); enemy_spawn_timer = 0
-
-        # Enemy move & shoot
-        for e in enemies[:]:
-            e["rect"].x -= int(level_params(level)["enemy_speed"])
-            e["rect"].y += e["vy"]
-            if e["rect"].top <= 0 or e["rect"].bottom >= HEIGHT: e["vy"] *= -1
-            if random.random() < level_params(level)["enemy_bullet_chance"]:
-                spawn_enemy_bullet(e["rect"].x, e["rect"].centery, -5, 0, size=8)
-            if e["rect"].right < 0: enemies.remove(e)
-
-        # Enemy bullets
-        for eb in enemy_bullets[:]:
-            eb["rect"].x += eb["vx"]; eb["rect"].y += eb["vy"]
-            if eb["rect"].colliderect(player):
-                player_hp -= 1; enemy_bullets.remove(eb)
-                if player_hp <= 0: game_state = STATE_GAME_OVER
-            elif eb["rect"].right < 0 or eb["rect"].left > WIDTH or eb["rect"].bottom < 0 or eb["rect"].top > HEIGHT:
-                enemy_bullets.remove(eb)
-
-        # Collide: player vs enemies
-        for e in enemies[:]:
-            if player.colliderect(e["rect"]):
-                player_hp -= 1; enemies.remove(e)
-                if player_hp <= 0: game_state = STATE_GAME_OVER
-
-        # Bullet vs enemies
-        for b in bullets[:]:
-            for e in enemies[:]:
-                if b.colliderect(e["rect"]):
-                    bullets.remove(b); e["hp"] -= 10
-                    if e["hp"] <= 0:
-                        enemy_dead_sound.play(); enemies.remove(e); player_gold += 100
-                        save_game(max(save_data.get("max_unlocked",1), level), player_gold)  # autosave gold
-                        if random.random() < 0.8:
-                            drop = random.choice(["heal","exp","speed","double"])
-                            items.append({"rect": pygame.Rect(e["rect"].x, e["rect"].y, 20, 20), "type": drop})
-                    break
-
-        # Items
-        for it in items[:]:
-            if player.colliderect(it["rect"]):
-                if it["type"] == "heal": player_hp = min(PLAYER_MAX_HP, player_hp+2)
-                elif it["type"] == "exp": player_exp += 10
-                elif it["type"] == "speed": bullet_fast=True; bullet_fast_timer=300
-                elif it["type"] == "double": bullet_double=True; bullet_double_timer=300
-                items.remove(it)
-        for it in items[:]:
-            it["rect"].y += 1
-            if it["rect"].top > HEIGHT: items.remove(it)
-
-        # Buff timers
-        if bullet_fast:
-            bullet_fast_timer -= 1
-            if bullet_fast_timer <= 0: bullet_fast = False
-        if bullet_double:
-            bullet_double_timer -= 1
-            if bullet_double_timer <= 0: bullet_double = False
-
-        # Boss spawn when EXP threshold reached
-        if player_exp >= 20 and boss is None:
-            boss = spawn_boss(); boss_alive = True
-
-        # Boss behavior
-        if boss:
-            boss["timer"] += 1
-            if boss["rect"].x > WIDTH - 240: boss["rect"].x -= 1
-            boss["rect"].y += boss["vy"]
-            if boss["rect"].top <= 0 or boss["rect"].bottom >= HEIGHT: boss["vy"] *= -1
-            boss_attack_pattern(boss)
-
-            for b in bullets[:]:
-                if b.colliderect(boss["rect"]):
-                    bullets.remove(b); boss["hp"] -= 5
-                    if boss["hp"] <= 0:
-                        boss = None; boss_alive = False
-                        player_gold += 1000; player_exp += 50
-                        current_unlocked = save_data.get("max_unlocked", 1)
-                        if current_unlocked < min(level + 1, MAX_LEVEL):
-                            save_data["max_unlocked"] = min(level + 1, MAX_LEVEL)
-                            save_data["gold"] = player_gold
-                            save_game(save_data["max_unlocked"], save_data["gold"])
-                        next_level_or_victory()
-                        break
-
-        # Autosave every ~10 seconds
-        autosave_interval_frames = 600  # 60fps * 10s
-        globals().setdefault("autosave_counter", 0)
-        autosave_counter = globals()["autosave_counter"] + 1
-        if autosave_counter >= autosave_interval_frames:
-            save_game(max(save_data.get("max_unlocked",1), level), player_gold)
-            autosave_counter = 0
-        globals()["autosave_counter"] = autosave_counter
-
-    # ---------- Draw ----------
-    if game_state in (STATE_MENU, STATE_LEVEL_SELECT):
-        draw_menu_bg()
-
-    if game_state == STATE_MENU:
-        label_center("", 40, title_font, WHITE)
-        # Buttons layout
-        bw, bh = 360, 64
-        gap = 26
-        start_y = HEIGHT//2 - (bh*3 + gap*2)//2
-        rects = [
-            pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*0, bw, bh),
-            pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*1, bw, bh),
-            pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*2, bw, bh),
-        ]
-        button(rects[0], "Continue (Enter)")
-        button(rects[1], "Level Select (L)")
-        button(rects[2], "New Game (N)")
-        tip = font.render("", True, (210,210,220))
-        screen.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT - 78))
-        # Quit area
-        q_rect = pygame.Rect(WIDTH//2-120, HEIGHT-56, 240, 40)
-        pygame.draw.rect(screen, (245,245,245), q_rect, border_radius=12)
-        pygame.draw.rect(screen, (40,40,40), q_rect, 2, border_radius=12)
-        q_lbl = font.render("Quit (Q)", True, (30,30,35)); screen.blit(q_lbl, (q_rect.centerx - q_lbl.get_width()//2, q_rect.centery - q_lbl.get_height()//2))
- 
-    elif game_state == STATE_LEVEL_SELECT:
-        label_center("Select Level", 36, title_font, WHITE)
-        bw, bh = 200, 120
-        spacing = 40
-        total_w = bw*3 + spacing*2
-        start_x = WIDTH//2 - total_w//2
-        y = HEIGHT//2 - bh//2
-        unlocked = save_data.get("max_unlocked", 1)
-        for i in range(3):
-            rect = pygame.Rect(start_x + i*(bw+spacing), y, bw, bh)
-            enabled = (i+1) <= unlocked
-            # draw card
-            shadow = rect.move(0,4); pygame.draw.rect(screen, (0,0,0,80), shadow, border_radius=14)
-            color = (245,245,245) if enabled else (210,210,210)
-            pygame.draw.rect(screen, color, rect, border_radius=14)
-            pygame.draw.rect(screen, (40,40,40), rect, 2, border_radius=14)
-            text = f"Level {i+1}\n{ERA_NAMES.get(i+1,'')}"
-            title = big_font.render(f"Level {i+1}", True, (30,30,35) if enabled else (120,120,120))
-            era = font.render(ERA_NAMES.get(i+1,""), True, (50,50,60) if enabled else (130,130,130))
-            screen.blit(title, (rect.centerx - title.get_width()//2, rect.y + 22))
-            screen.blit(era, (rect.centerx - era.get_width()//2, rect.y + 22 + title.get_height() + 6))
-            if not enabled:
-                # lock overlay
-                overlay = pygame.Surface((rect.w, rect.h), pygame.SRCALPHA); overlay.fill((100,100,100,90))
-                screen.blit(overlay, rect.topleft)
-        tip = font.render("Click a level (or press 1-3). ESC to menu.", True, (210,210,220))
-        screen.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT - 60)) 
-
-    elif game_state in (STATE_PLAYING, STATE_SHOP, STATE_LEVEL_INTRO):
-        # Background
-        screen.blit(BG_IMAGES.get(level, list(BG_IMAGES.values())[0]), (0,0))
-        # Player
-        screen.blit(player_img, player)
-
-        # Enemies
-        for e in enemies:
-            screen.blit(ENEMY_IMAGES.get(level, list(ENEMY_IMAGES.values())[0]), e["rect"].topleft)
-            # small HP bar for enemies
-            pygame.draw.rect(screen, RED,   (e["rect"].x, e["rect"].y - 8, 40, 5))
-            pygame.draw.rect(screen, GREEN, (e["rect"].x, e["rect"].y - 8, int(40 * e["hp"]/level_params(level)["enemy_hp"]), 5))
-
-        # Bullets
-        for b in bullets:
-            pygame.draw.rect(screen, WHITE, b)
-        for eb in enemy_bullets:
-            pygame.draw.rect(screen, YELLOW, eb["rect"])
-
-        # Items
-        for it in items:
-            img = item_images.get(it["type"])
-            if img: screen.blit(img, it["rect"])
-
-        # Boss
-        if boss:
-            screen.blit(BOSS_IMAGES.get(level, list(BOSS_IMAGES.values())[0]), boss["rect"].topleft)
-            # boss HP bar
-            pygame.draw.rect(screen, RED, (300, 20, 220, 15))
-            # need boss hp; approximate if missing
-            # In this script we hold hp in boss["hp"]
-            pygame.draw.rect(screen, GREEN, (300, 20, int(220 * boss["hp"]/level_params(level)["boss_hp"]), 15))
-            screen.blit(font.render(f"BOSS - {ERA_NAMES.get(level,'')}", True, BLACK), (300, 0))
-
-        # HUD (HP bar + texts)
-        draw_hp_bar(10, 10, player_hp, PLAYER_MAX_HP, width=120, height=12)
-        screen.blit(font.render(f"EXP: {player_exp}", True, WHITE), (10, 30))
-        screen.blit(font.render(f"Gold: {player_gold}", True, WHITE), (10, 50))
-        screen.blit(font.render(f"Level: {level}/{MAX_LEVEL} - {ERA_NAMES.get(level,'')}", True, WHITE), (10, 70))
-
-        if game_state == STATE_LEVEL_INTRO:
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA); overlay.fill((255,255,255,170))
-            screen.blit(overlay, (0,0))
-            intro = big_font.render(f"Level {level} - {ERA_NAMES.get(level,'')}", True, BLACK)
-            tip = font.render("Press any key to start (S = Shop)", True, BLACK)
-            screen.blit(intro, (WIDTH//2 - intro.get_width()//2, HEIGHT//2 - 40))
-            screen.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT//2 + 10))
-
-        # ===== Shop (KEEP original panel style) =====
-
-        # ===== Shop (card-style from new.py) =====
-        if game_state == STATE_SHOP:
-            # Title
-            shop_text = big_font.render("[SHOP]", True, WHITE)
-            screen.blit(shop_text, (WIDTH // 2 - shop_text.get_width() // 2, 20))
-
-            shop_items = [
-                {"img": shop_images["double"], "name": "Double", "price": 300, "key": "1"},
-                {"img": shop_images["speed"],  "name": "Speed",  "price": 200, "key": "2"},
-                {"img": shop_images["heal"],   "name": "Heal +3","price": 150, "key": "3"},
-            ]
-
-            y_base = 90
-            for i, item in enumerate(shop_items):
-                card_rect = pygame.Rect(WIDTH // 2 - 180, y_base + i * 100, 360, 90)
-                pygame.draw.rect(screen, (230, 230, 230), card_rect, border_radius=12)
-                pygame.draw.rect(screen, BLACK, card_rect, 2, border_radius=12)
-
-                if item["img"]:
-                    img = pygame.transform.scale(item["img"], (60, 60))
-                    screen.blit(img, (card_rect.x + 15, card_rect.y + 15))
-
-                name_text = font.render(f"{item['key']}. {item['name']}", True, BLACK)
-                price_text = font.render(f"{item['price']} $$", True, (120, 70, 0))
-                screen.blit(name_text, (card_rect.x + 90, card_rect.y + 25))
-                screen.blit(price_text, (card_rect.x + 90, card_rect.y + 50))
-
-            exit_text = font.render("(ESC to close)", True, BLACK)
-            screen.blit(exit_text, (WIDTH // 2 - exit_text.get_width() // 2, y_base + len(shop_items) * 100 + 20))
-
-    if game_state == STATE_GAME_OVER:
-        label_center("Game Over", HEIGHT//2 - 40, big_font, RED)
-        tip = font.render("R: Restart   Q/Esc: Quit", True, WHITE)
-        screen.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT//2 + 10))
-
-    if game_state == STATE_VICTORY:
-        label_center("Victory!", HEIGHT//2 - 60, big_font, GREEN)
-        tip = font.render("R: Restart   Q/Esc: Quit", True, WHITE)
-        screen.blit(tip, (WIDTH//2 - tip.get_width()//2, HEIGHT//2 - 10))
-
-    pygame.display.flip()
-    clock.tick(60)
+IDLE_WAIT_MS = 500   # longest sleep on a static scene before the loop goes round anyway
+DRIVER_KEYS = (pygame.K_F3, pygame.K_F4)   # profiler overlay, quality: handled by main(), not the world
+
+def main(dirty_rects=False, fps=FPS, max_steps=5, frame_skip=0, pace_stats=False, seed=None, record=None,
+         trace=None, trace_frames=600, pixel_collision=False, quality_mode="auto", auto_fire=AUTO_FIRE_TICKS):
+    """Interactive loop: the simulation ticks at a fixed 60 Hz, rendering runs at `fps` (0 = uncapped)
+    and draws entities interpolated between their last two ticks. With `record`, the session's inputs
+    are written to that file on quit for --replay. F3 toggles the profiler overlay; with `trace`, the
+    last `trace_frames` frames are written there as a Chrome trace on quit. `quality_mode` is "auto"
+    (a QualityGovernor trades detail for frame rate) or a fixed quality.LEVELS name; F4 cycles it.
+    Holding SPACE fires every `auto_fire` ticks (0 = one shot per press)."""
+    init_display(); load_assets()
+    world = GameWorld(max_steps=max_steps, frame_skip=frame_skip, seed=seed)
+    if pixel_collision: world.hit_masks = build_hit_masks()
+    world.auto_fire_ticks = auto_fire
+    if record: world.recorder = InputRecorder(world)
+    buf = prof_overlay.inputs = InputBuffer(auto_fire=auto_fire > 0, driver_keys=DRIVER_KEYS)
+    prof = world.profiler = FrameProfiler(GameWorld.PLAY_PHASES, capacity=trace_frames, enabled=bool(trace))
+    governor = QualityGovernor(fps or FPS, auto=quality_mode == "auto",
+                               start=QUALITY_NAMES.index(quality_mode) if quality_mode in QUALITY_NAMES else 0)
+    apply_quality(governor)
+    dirty = quality_renderer(None, dirty_rects)
+    gc.freeze()  # assets, fonts and pre-filled pools live forever; keep them out of every collection
+    clock.tick(); dt = 0.0
+    while True:
+        prof.begin_frame()
+        # A static scene is already on screen and only input can change it: sleep in the event queue
+        # instead of redrawing it 60 times a second (not while the F3 graph is live)
+        idle = world.scene.static and not prof_overlay.visible
+        buf.pump(IDLE_WAIT_MS if idle else 0)
+        if buf.exposed: buf.exposed = False; invalidate_static(dirty)
+        if idle:
+            clock.tick(); dt = min(dt, FRAME_DT)   # the sleep is not simulation time to catch up on
+        n = world.timestep.advance(dt)
+        steps = buf.take(n, time.perf_counter() - world.timestep.acc, FRAME_DT)
+        for key in buf.take_driver_presses():
+            if key == pygame.K_F3:
+                prof_overlay.visible = not prof_overlay.visible
+                if prof.enabled != (prof_overlay.visible or bool(trace)): prof.toggle()
+                if dirty: dirty.invalidate()
+            else:
+                cycle_quality(governor); apply_quality(governor); dirty = quality_renderer(dirty, dirty_rects)
+        prof.lap("events")
+        ticks = world.step_many(steps); prof.lap("update")
+        play_event_sounds(world); update_particles(world, ticks); preload_levels(world); prof.lap("effects")
+        if world.quit_requested:
+            if pace_stats: print_pace_stats(world, buf)
+            if record: world.recorder.save(record, world)
+            if trace: print(f"{prof.export_chrome(trace)} trace events written to {trace}")
+            level_loader.close(); pygame.quit(); sys.exit()
+        if not world.timestep.skip_render():
+            render_frame(world, dirty, prof); buf.presented()
+            if sounds.enabled is None: sounds.preload()   # mixer start and decoding behind the first menu frame, not the first shot
+        buf.pump()   # stamp what arrived while drawing now, not after the frame cap's sleep
+        dt = clock.tick(fps) / 1000.0; prof.lap("wait")
+        if not idle and governor.sample(clock.get_rawtime()):   # work time, without the cap's sleep
+            apply_quality(governor); dirty = quality_renderer(dirty, dirty_rects)
+        prof.end_frame(world)
+
+def apply_quality(governor):
+    """Make the governor's current level the one drawing uses."""
+    global quality, quality_label
+    quality = governor.level; quality_label = governor.label
+    particles.quality = quality.particles
+
+def cycle_quality(governor):
+    """F4: auto -> each fixed level, best first -> auto."""
+    if governor.auto: governor.auto = False; governor.set(0)
+    elif governor.index < len(governor.levels) - 1: governor.set(governor.index + 1)
+    else: governor.auto = True; governor.set(0)
+
+def quality_renderer(dirty, dirty_rects):
+    """The DirtyRectRenderer that --dirty-rects or the current quality calls for (None: flip every frame)."""
+    if not (dirty_rects or quality.dirty_rects): return None
+    if dirty is None: return DirtyRectRenderer((WIDTH, HEIGHT))
+    dirty.invalidate()
+    return dirty
+
+def print_pace_stats(world, inputs=None):
+    st = world.timestep.stats()
+    if not st: return
+    print(f"{st['frames']} frames / {st['ticks']} ticks, {st['fps']:.1f} fps, frame {st['mean_ms']:.2f} ms "
+          f"(jitter {st['jitter_ms']:.2f}, p99 {st['p99_ms']:.2f}, max {st['max_ms']:.2f}), "
+          f"skipped {st['skipped']} renders, dropped {st['dropped_s']:.3f}s")
+    lat = inputs.stats() if inputs is not None else {}
+    if lat:
+        print(f"input-to-present latency over the last {len(inputs.latency)} of {lat['presses']} presses: "
+              f"mean {lat['mean_ms']:.2f} ms, p50 {lat['p50_ms']:.2f}, p95 {lat['p95_ms']:.2f}, max {lat['max_ms']:.2f}")
+
+def main_headless(frames, seed=None, record=None):
+    init_headless()
+    world = GameWorld(save_path=None, seed=seed)
+    if record: world.recorder = InputRecorder(world)
+    t0 = time.perf_counter()
+    run_headless(frames, world=world)
+    elapsed = time.perf_counter() - t0
+    print(f"{world.frame} frames in {elapsed:.2f}s ({world.frame/max(elapsed,1e-9):.0f} fps), "
+          f"state={world.game_state} level={world.level} gold={world.player_gold} seed={world.seed}")
+    if record: world.recorder.save(record, world)
+
+def main_replay(path):
+    """Re-run a recording headless with no frame cap; report speed and whether the end state matched."""
+    init_headless()
+    rec = Recording.load(path)
+    world = rec.world()
+    if rec.meta.get("pixel_collision"):   # the masks come from the sprites, so they need a (dummy) display
+        init_display(); load_assets(); world.hit_masks = build_hit_masks()
+    t0 = time.perf_counter()
+    rec.play(world)
+    elapsed = time.perf_counter() - t0
+    ok = rec.verify(world)
+    print(f"{world.frame} ticks in {elapsed:.2f}s ({world.frame/max(elapsed,1e-9):.0f} ticks/s), "
+          f"state={world.game_state} level={world.level} gold={world.player_gold} digest={state_digest(world)} "
+          f"{'unverified' if ok is None else 'match' if ok else 'MISMATCH'}")
+    return ok is not False
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="橫向射擊遊戲：闖關版")
+    ap.add_argument("--headless", action="store_true", help="run the simulation without a window, sound or frame cap")
+    ap.add_argument("--frames", type=int, default=10000, help="frames to simulate in headless mode")
+    ap.add_argument("--dirty-rects", action="store_true", help="redraw only changed screen areas instead of flipping every frame")
+    ap.add_argument("--fps", type=int, default=FPS, help="render frame cap (0 = uncapped); the simulation always ticks at 60 Hz")
+    ap.add_argument("--max-steps", type=int, default=5, help="most simulation ticks one slow frame may catch up")
+    ap.add_argument("--frame-skip", type=int, default=0, help="renders that may be skipped in a row while catching up")
+    ap.add_argument("--pace-stats", action="store_true", help="print frame pacing statistics on exit")
+    ap.add_argument("--seed", type=int, default=None, help="seed for gameplay randomness (default: random)")
+    ap.add_argument("--record", metavar="PATH", help="record this session's inputs to PATH")
+    ap.add_argument("--replay", metavar="PATH", help="re-run a recording headless as fast as possible and check its end state")
+    ap.add_argument("--trace", metavar="PATH", help="profile every frame and write a Chrome trace-event JSON to PATH on quit")
+    ap.add_argument("--trace-frames", type=int, default=600, help="how many of the most recent frames the trace keeps")
+    ap.add_argument("--pixel-collision", action="store_true", help="hits need the drawn sprites' pixels to touch, not just the hitboxes")
+    ap.add_argument("--quality", choices=("auto",) + QUALITY_NAMES, default="auto",
+                    help="render quality; auto lowers it while frames run over budget (F4 cycles in game)")
+    ap.add_argument("--auto-fire", type=int, default=AUTO_FIRE_TICKS, metavar="TICKS",
+                    help="ticks between shots while SPACE is held (0 = one shot per press)")
+    args = ap.parse_args()
+    if args.replay: sys.exit(0 if main_replay(args.replay) else 1)
+    elif args.headless: main_headless(args.frames, args.seed, args.record)
+    else: main(args.dirty_rects, args.fps, args.max_steps, args.frame_skip, args.pace_stats, args.seed, args.record,
+               args.trace, args.trace_frames, args.pixel_collision, args.quality, args.auto_fire)
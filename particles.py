@@ -0,0 +1,124 @@
+import math
+
+import numpy as np
+
+# Particle effects (explosions, hit sparks, pickups). Purely visual: driven from
+# the world's (name, x, y) events by the presentation layer, with their own RNG,
+# so they never touch gameplay state or replays.
+#
+# All particles live in one set of preallocated arrays of fixed `capacity` used
+# as a ring: a burst always writes over the oldest slots, so the budget is hard
+# and nothing is ever allocated after start-up. Update and draw are batched
+# passes over the arrays.
+#
+# Level of detail: bursts shrink as the ring fills (and with `quality`, which a
+# caller may lower when frames run long), and bursts whose origin is further than
+# `cull_dist` outside the screen are not spawned at all.
+
+# Effect table: particles per burst, speed range (px/tick), life range (ticks),
+# emission direction and cone width (degrees, 0 = right, 90 = down), gravity
+# (px/tick^2), drag (velocity kept per tick), start size (px), palette.
+EFFECTS = {
+    "enemy_dead": dict(count=24, speed=(1.0, 4.0), life=(18, 36), angle=0, cone=360, gravity=0.05, drag=0.93,
+                       size=5, colors=((255, 220, 80), (255, 140, 30), (230, 60, 20))),
+    "boss_hit":   dict(count=5, speed=(2.0, 5.0), life=(6, 14), angle=180, cone=90, gravity=0.0, drag=0.85,
+                       size=3, colors=((255, 255, 255), (255, 240, 120))),
+    "boss_dead":  dict(count=160, speed=(1.0, 7.0), life=(30, 70), angle=0, cone=360, gravity=0.04, drag=0.95,
+                       size=6, colors=((255, 255, 200), (255, 200, 60), (255, 110, 20), (200, 40, 20))),
+    "player_hit": dict(count=14, speed=(1.5, 4.0), life=(12, 24), angle=0, cone=360, gravity=0.0, drag=0.9,
+                       size=4, colors=((255, 60, 60), (255, 160, 160))),
+    "pickup":     dict(count=12, speed=(0.8, 2.0), life=(16, 28), angle=270, cone=140, gravity=-0.02, drag=0.96,
+                       size=3, colors=((120, 255, 160), (255, 255, 140))),
+}
+
+class ParticleSystem:
+    """Ring of `capacity` particles as parallel arrays (x, y, vx, vy, life, max_life, color, drag, gravity)."""
+
+    def __init__(self, capacity=2048, bounds=(800, 400), cull_dist=40, seed=None, effects=EFFECTS):
+        self.capacity = capacity
+        self.width, self.height = bounds
+        self.cull_dist = cull_dist
+        self.quality = 1.0
+        self.rng = np.random.default_rng(seed)
+        self.head = 0                      # next slot to write; also the oldest particle
+        f = np.float32
+        self.x = np.zeros(capacity, f); self.y = np.zeros(capacity, f)
+        self.vx = np.zeros(capacity, f); self.vy = np.zeros(capacity, f)
+        self.life = np.zeros(capacity, f); self.max_life = np.ones(capacity, f)
+        self.drag = np.ones(capacity, f); self.gravity = np.zeros(capacity, f)
+        self.size = np.zeros(capacity, np.uint8)
+        self.color = np.zeros(capacity, np.uint8)     # index into self.palette
+        self.live = 0                                  # particles with life left, as of the last update
+        self.palette = []; self._color_index = {}; self.max_size = 0
+        self.effects = {}
+        for name, spec in effects.items(): self.define(name, **spec)
+        self.spawned = 0; self.culled = 0
+
+    def define(self, name, count, speed, life, angle, cone, gravity, drag, size, colors):
+        idx = []
+        for c in colors:
+            if c not in self._color_index:
+                self._color_index[c] = len(self.palette); self.palette.append(c)
+            idx.append(self._color_index[c])
+        self.max_size = max(self.max_size, size)
+        self.effects[name] = (count, speed, life, math.radians(angle), math.radians(cone), gravity, drag, size,
+                              np.array(idx, np.uint8))
+
+    def __len__(self):
+        return self.live
+
+    def clear(self):
+        self.life[:] = 0; self.live = 0
+
+    # ---------- Spawning ----------
+    def burst(self, name, x, y):
+        """Spawn effect `name` at (x, y), scaled down by load and quality; oldest particles are recycled."""
+        spec = self.effects.get(name)
+        if spec is None: return 0
+        d = self.cull_dist
+        if x < -d or y < -d or x > self.width + d or y > self.height + d:
+            self.culled += 1; return 0
+        count, (s0, s1), (l0, l1), angle, cone, gravity, drag, size, colors = spec
+        load = self.live / self.capacity
+        k = min(int(count * self.quality * (1.0 - 0.75 * load) + 0.5), self.capacity)
+        if k <= 0: return 0
+
+        rng = self.rng
+        a = angle + (rng.random(k, np.float32) - 0.5) * cone
+        sp = s0 + rng.random(k, np.float32) * (s1 - s0)
+        lf = l0 + rng.random(k, np.float32) * (l1 - l0)
+        i = (self.head + np.arange(k)) % self.capacity
+        self.x[i] = x; self.y[i] = y
+        self.vx[i] = np.cos(a) * sp; self.vy[i] = np.sin(a) * sp
+        self.life[i] = lf; self.max_life[i] = lf
+        self.drag[i] = drag; self.gravity[i] = gravity; self.size[i] = size
+        self.color[i] = colors[rng.integers(0, len(colors), k)]
+        self.head = (self.head + k) % self.capacity
+        self.live = min(self.capacity, self.live + k)
+        self.spawned += k
+        return k
+
+    def emit_events(self, events):
+        for name, x, y in events:
+            if name in self.effects: self.burst(name, x, y)
+
+    # ---------- Passes ----------
+    def update(self, ticks=1):
+        """Advance every particle `ticks` simulation ticks; off-screen particles die."""
+        if not self.live or ticks <= 0: return
+        life = self.life
+        for _ in range(ticks):
+            self.vx *= self.drag; self.vy *= self.drag; self.vy += self.gravity
+            self.x += self.vx; self.y += self.vy
+            life -= 1
+        life[(self.x < 0) | (self.y < 0) | (self.x >= self.width) | (self.y >= self.height)] = 0
+        self.live = int(np.count_nonzero(life > 0))
+
+    def visible(self):
+        """Live particles as (positions [[x, y], ...], sizes, color indices); sizes shrink with remaining life."""
+        alive = np.flatnonzero(self.life > 0)
+        if not len(alive): return [], np.zeros(0, np.int64), np.zeros(0, np.int64)
+        size = np.maximum(1, np.ceil(self.size[alive] * (self.life[alive] / self.max_life[alive]))).astype(np.int64)
+        half = size // 2
+        pos = np.column_stack((self.x[alive].astype(np.int64) - half, self.y[alive].astype(np.int64) - half))
+        return pos.tolist(), size, self.color[alive].astype(np.int64)
@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+
+# Boss bullet patterns. levels.json describes each boss as emitters (what to
+# fire, how often) grouped into phases keyed to the boss's remaining HP; they
+# are compiled here once per level into velocity arrays, so firing a volley is
+# a table lookup plus one ProjectileStore.spawn_many().
+#
+# Angles are in degrees; 0 points straight left (at the player's side of the
+# screen) and positive angles turn downwards, i.e. velocity = speed * (-cos a, sin a).
+#
+# Emitter kinds (all take "every" ticks, optional "start" delay, "size", "origin" [dx, dy]):
+#   velocities  {"velocities": [[vx, vy], ...]}          fixed velocities
+#   fan/spread  {"fan": {"speed", "angles": [...]}}      fixed angles
+#   ring        {"ring": {"speed", "count", "offset"}}  `count` pellets evenly round 360 degrees
+#   spiral      {"spiral": {"speed", "arms", "turn", "offset"}}  ring of `arms`, rotated `turn` per volley
+#   aimed       {"aimed": {"speed", "angles": [...]}}    angles relative to the line to the player
+
+DIR_STEPS = 1440                                   # direction table resolution: 0.25 degrees
+_theta = np.arange(DIR_STEPS) * (2 * math.pi / DIR_STEPS)
+DIR_X = -np.cos(_theta); DIR_Y = np.sin(_theta)
+DIR_X.setflags(write=False); DIR_Y.setflags(write=False)
+
+def _dir_index(deg):
+    return np.rint(np.asarray(deg, dtype=np.float64) * (DIR_STEPS / 360.0)).astype(np.int64) % DIR_STEPS
+
+def _frozen(a):
+    a = np.array(a, dtype=np.float64); a.setflags(write=False)
+    return a
+
+class Emitter:
+    """One compiled emitter. `vx`/`vy` hold fixed velocities; spiral/aimed ones hold table offsets instead."""
+    __slots__ = ("kind", "every", "start", "size", "ox", "oy", "vx", "vy", "speed", "offsets", "turn")
+
+    def __init__(self, kind, every, start=0, size=10, origin=(-20, 0), vx=None, vy=None,
+                 speed=0.0, offsets=None, turn=0):
+        self.kind = kind; self.every = max(1, int(every)); self.start = int(start); self.size = size
+        self.ox, self.oy = origin
+        self.vx = vx; self.vy = vy; self.speed = speed; self.offsets = offsets; self.turn = turn
+
+    def velocities(self, volley, aim_deg):
+        """(vx, vy) arrays for the `volley`-th shot of this emitter."""
+        if self.kind == "spiral":
+            idx = (self.offsets + volley * self.turn) % DIR_STEPS
+        elif self.kind == "aimed":
+            idx = (self.offsets + _dir_index(aim_deg)) % DIR_STEPS
+        else:
+            return self.vx, self.vy
+        return DIR_X[idx] * self.speed, DIR_Y[idx] * self.speed
+
+def compile_emitter(v):
+    common = dict(every=v["every"], start=v.get("start", 0), size=v.get("size", 10),
+                  origin=tuple(v.get("origin", (-20, 0))))
+    if "velocities" in v:
+        return Emitter("fixed", vx=_frozen([p[0] for p in v["velocities"]]),
+                       vy=_frozen([p[1] for p in v["velocities"]]), **common)
+    spec = v.get("fan") or v.get("spread")
+    if spec is not None:
+        # exact trig here (not the table), once per level
+        speed = spec["speed"]; angs = [math.radians(a) for a in spec["angles"]]
+        return Emitter("fixed", vx=_frozen([-speed * math.cos(a) for a in angs]),
+                       vy=_frozen([speed * math.sin(a) for a in angs]), **common)
+    if "ring" in v:
+        spec = v["ring"]; n = int(spec["count"])
+        idx = _dir_index(spec.get("offset", 0) + np.arange(n) * (360.0 / n))
+        return Emitter("fixed", vx=_frozen(DIR_X[idx] * spec["speed"]), vy=_frozen(DIR_Y[idx] * spec["speed"]), **common)
+    if "spiral" in v:
+        spec = v["spiral"]; n = int(spec.get("arms", 1))
+        offsets = _dir_index(spec.get("offset", 0) + np.arange(n) * (360.0 / n))
+        return Emitter("spiral", speed=spec["speed"], offsets=offsets, turn=int(_dir_index(spec["turn"])), **common)
+    if "aimed" in v:
+        spec = v["aimed"]
+        return Emitter("aimed", speed=spec["speed"], offsets=_dir_index(spec.get("angles", (0,))), **common)
+    raise ValueError(f"unknown emitter: {sorted(v)}")
+
+class BossPattern:
+    """Emitter phases keyed to remaining HP. phases: ((hp_fraction, emitters), ...), highest fraction first."""
+    __slots__ = ("phases",)
+
+    def __init__(self, phases):
+        self.phases = tuple(sorted(phases, key=lambda p: -p[0]))
+
+    def emitters(self, hp_frac):
+        """Emitters of the last phase whose threshold `hp_frac` has dropped to."""
+        current = ()
+        for threshold, emitters in self.phases:
+            if hp_frac <= threshold: current = emitters
+            else: break
+        return current
+
+    def fire(self, store, t, x, y, hp_frac=1.0, target=None):
+        """Spawn the volleys due at tick `t` of the fight from (x, y) into `store`; aimed emitters aim at `target`."""
+        aim = 0.0
+        for em in self.emitters(hp_frac):
+            if t < em.start or (t - em.start) % em.every: continue
+            if em.kind == "aimed" and target is not None:
+                tx, ty = target
+                aim = math.degrees(math.atan2(ty - (y + em.oy), -(tx - (x + em.ox))))
+            vx, vy = em.velocities((t - em.start) // em.every, aim)
+            store.spawn_many(x + em.ox, y + em.oy, vx, vy, em.size)
+
+def compile_pattern(raw):
+    """levels.json "boss_pattern" (a list of emitters = one phase) or "boss_phases" -> BossPattern."""
+    if raw.get("boss_phases"):
+        return BossPattern([(float(p.get("hp", 1.0)), tuple(compile_emitter(v) for v in p["emitters"]))
+                            for p in raw["boss_phases"]])
+    return BossPattern([(1.0, tuple(compile_emitter(v) for v in raw.get("boss_pattern", ())))])
@@ -0,0 +1,29 @@
+# Free-list pools and in-place compaction for the entity lists (enemies, items).
+# Records carry an `alive` flag: passes only clear it, and sweep() compacts the
+# list once, handing dead records back to their pool.
+
+class RecordPool:
+    """Free list of entity records. acquire() reuses a released record when one is available."""
+
+    def __init__(self, make, prefill=0):
+        self.make = make
+        self.free = [make() for _ in range(prefill)]
+
+    def acquire(self):
+        return self.free.pop() if self.free else self.make()
+
+    def release(self, rec):
+        self.free.append(rec)
+
+    def release_all(self, lst):
+        self.free.extend(lst); lst.clear()
+
+def sweep(lst, pool):
+    """Drop records whose `alive` flag is cleared, in place, in one pass, keeping order."""
+    j = 0
+    for rec in lst:
+        if rec.alive:
+            lst[j] = rec; j += 1
+        else:
+            pool.release(rec)
+    del lst[j:]
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+# Level transitions. While a level is played, the next one is prepared on a
+# worker thread (the caller starts this when it sees the boss appear), so the
+# switch itself only installs data that is already decoded. Only the current
+# level and the next one stay resident; anything else is unloaded, so memory
+# stays flat however many levels levels.json grows to.
+
+class LevelPreloader:
+    """`load(lv)` runs on the worker and returns prepared data; `install(lv, data)` and
+    `unload(lv)` run on the thread that calls poll()/activate() (the main thread)."""
+
+    def __init__(self, load, install, unload, max_level):
+        self.load = load; self.install = install; self.unload = unload
+        self.max_level = max_level
+        self.pending = {}       # level -> Future of load(level)
+        self.resident = set()   # installed levels
+        self.current = None
+        self.hits = 0; self.stalls = 0; self.misses = 0
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-preload")
+
+    def prefetch(self, lv):
+        """Start preparing level `lv` in the background (no-op if it is ready, queued or out of range)."""
+        if 1 <= lv <= self.max_level and lv not in self.resident and lv not in self.pending:
+            self.pending[lv] = self._pool.submit(self.load, lv)
+
+    def poll(self):
+        """Install whatever the worker has finished; call once a frame."""
+        for lv in [lv for lv, fut in self.pending.items() if fut.done()]:
+            self._install(lv, self.pending.pop(lv))
+
+    def _install(self, lv, fut):
+        try: data = fut.result()
+        except Exception: data = self.load(lv)   # a failed prefetch is retried here, where errors surface
+        self.install(lv, data); self.resident.add(lv)
+
+    def activate(self, lv):
+        """Make `lv` current: use it if resident, else wait for its prefetch, else load it now.
+        Then unload every level but `lv` and `lv + 1`."""
+        if lv == self.current: return
+        self.current = lv
+        if lv in self.resident:
+            self.hits += 1
+        elif lv in self.pending:
+            fut = self.pending.pop(lv)
+            if not fut.done(): self.stalls += 1
+            self._install(lv, fut)
+        else:
+            self.misses += 1
+            self.install(lv, self.load(lv)); self.resident.add(lv)
+        keep = (lv, lv + 1)
+        for old in [l for l in self.resident if l not in keep]:
+            self.unload(old); self.resident.discard(old)
+        for old in [l for l in self.pending if l not in keep]:
+            self.pending.pop(old).cancel()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
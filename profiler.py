@@ -0,0 +1,107 @@
+import json
+import time
+
+import numpy as np
+
+# Frame profiler. The main loop calls begin_frame(), then lap(section) after each
+# part of the frame; time since the previous lap is charged to that section.
+# Simulation phases inside the update are charged with add(). Everything lands
+# in fixed-size ring buffers (the last `capacity` frames), so a long session
+# costs no more memory than a short one. While disabled every call returns at
+# the first line.
+
+LOOP_SECTIONS = ("events", "update", "effects", "draw", "present", "wait")
+COUNTERS = ("bullets", "enemy_bullets", "enemies", "items")
+
+class FrameProfiler:
+    def __init__(self, phases=(), capacity=600, enabled=False):
+        self.sections = LOOP_SECTIONS + tuple(phases)
+        self.index = {name: i for i, name in enumerate(self.sections)}
+        self.capacity = capacity
+        self.enabled = enabled
+        self.dur = np.zeros((capacity, len(self.sections)), np.int64)     # ns per section
+        self.start = np.zeros((capacity, len(self.sections)), np.int64)   # first start of each section, ns
+        self.frame_start = np.zeros(capacity, np.int64)
+        self.counts = np.zeros((capacity, len(COUNTERS)), np.int32)
+        self.frames = 0          # frames recorded so far (ring position = frames % capacity)
+        self._row = 0; self._last = 0
+        self.t0 = time.perf_counter_ns()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._last = 0
+
+    def begin_frame(self):
+        if not self.enabled: return
+        now = time.perf_counter_ns()
+        r = self._row = self.frames % self.capacity
+        self.dur[r] = 0; self.start[r] = 0; self.frame_start[r] = now
+        self._last = now
+
+    def lap(self, section):
+        """Charge the time since the previous lap (or begin_frame) to a loop section."""
+        if not self.enabled or not self._last: return
+        now = time.perf_counter_ns()
+        i = self.index[section]; r = self._row
+        if not self.dur[r, i]: self.start[r, i] = self._last
+        self.dur[r, i] += now - self._last
+        self._last = now
+
+    def add(self, section, started, ns):
+        """Charge `ns` measured elsewhere (e.g. one simulation phase) to `section`."""
+        if not self.enabled or not self._last: return
+        i = self.index[section]; r = self._row
+        if not self.dur[r, i]: self.start[r, i] = started
+        self.dur[r, i] += ns
+
+    def end_frame(self, world=None):
+        if not self.enabled or not self._last: return
+        if world is not None:
+            self.counts[self._row] = (len(world.bullets), len(world.enemy_bullets), len(world.enemies), len(world.items))
+        self.frames += 1
+
+    # ---------- Reading ----------
+    def recent(self, n=None):
+        """Row indices of the last `n` recorded frames, oldest first."""
+        have = min(self.frames, self.capacity)
+        n = have if n is None else min(n, have)
+        return (np.arange(self.frames - n, self.frames) % self.capacity) if n else np.zeros(0, np.int64)
+
+    def frame_ms(self, rows):
+        """Whole-frame time per row: loop sections only (phases are already inside "update")."""
+        return self.dur[rows, :len(LOOP_SECTIONS)].sum(axis=1) / 1e6
+
+    def summary(self, n=120):
+        rows = self.recent(n)
+        if not len(rows): return {}
+        ms = self.frame_ms(rows)
+        out = {"frame_ms": float(ms.mean()), "p99_ms": float(np.percentile(ms, 99)), "max_ms": float(ms.max())}
+        for i, name in enumerate(self.sections):
+            out[name] = float(self.dur[rows, i].mean() / 1e6)
+        for i, name in enumerate(COUNTERS):
+            out[name] = int(self.counts[rows[-1], i])
+        return out
+
+    def export_chrome(self, path):
+        """Write the buffered frames as Chrome trace-event JSON (chrome://tracing, Perfetto).
+
+        Loop sections go on thread 1; simulation phases on thread 2, each as one span from
+        its first start covering its summed time for the frame.
+        """
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "main loop"}},
+                  {"name": "thread_name", "ph": "M", "pid": 1, "tid": 2, "args": {"name": "simulation"}}]
+        nloop = len(LOOP_SECTIONS)
+        for r in self.recent():
+            fs = int(self.frame_start[r])
+            total = int(self.dur[r, :nloop].sum())
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1, "ts": (fs - self.t0) / 1e3, "dur": total / 1e3})
+            for i, name in enumerate(self.sections):
+                d = int(self.dur[r, i])
+                if not d: continue
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 1 if i < nloop else 2,
+                               "ts": (int(self.start[r, i]) - self.t0) / 1e3, "dur": d / 1e3})
+            events.append({"name": "entities", "ph": "C", "pid": 1, "ts": (fs - self.t0) / 1e3,
+                           "args": dict(zip(COUNTERS, self.counts[r].tolist()))})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
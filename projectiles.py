@@ -0,0 +1,119 @@
+import numpy as np
+
+# Struct-of-arrays projectile storage. Live projectiles are packed densely in
+# slots [0, n) in spawn order; kill() only marks, compact() sweeps once per pass.
+
+class ProjectileStore:
+    """Projectiles as parallel float arrays (x, y, vx, vy, size, alive).
+
+    Positions keep sub-pixel precision; they are only floored when drawn.
+    px/py hold each projectile's position before the last move, for interpolated drawing.
+    Capacity doubles when full, so steady-state play never reallocates.
+    """
+
+    def __init__(self, capacity=256):
+        self.n = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        old = getattr(self, "x", None)
+        fields = {}
+        for name, dtype in (("x", np.float64), ("y", np.float64), ("px", np.float64), ("py", np.float64),
+                            ("vx", np.float64), ("vy", np.float64), ("size", np.float64), ("alive", np.bool_)):
+            arr = np.zeros(capacity, dtype)
+            if old is not None: arr[:self.n] = getattr(self, name)[:self.n]
+            fields[name] = arr
+        self.__dict__.update(fields)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.n
+
+    def clear(self):
+        self.n = 0
+
+    def spawn(self, x, y, vx, vy, size):
+        n = self.n
+        if n == self.capacity: self._alloc(self.capacity * 2)
+        self.x[n] = self.px[n] = x; self.y[n] = self.py[n] = y; self.vx[n] = vx; self.vy[n] = vy
+        self.size[n] = size; self.alive[n] = True
+        self.n = n + 1
+
+    def spawn_many(self, x, y, vx, vy, size):
+        """Append a batch; every argument may be a scalar or an array of the batch length."""
+        k = max(np.size(a) for a in (x, y, vx, vy, size))
+        n = self.n
+        if n + k > self.capacity:
+            cap = self.capacity
+            while cap < n + k: cap *= 2
+            self._alloc(cap)
+        end = n + k
+        self.x[n:end] = x; self.y[n:end] = y; self.vx[n:end] = vx; self.vy[n:end] = vy
+        self.px[n:end] = self.x[n:end]; self.py[n:end] = self.y[n:end]
+        self.size[n:end] = size; self.alive[n:end] = True
+        self.n = end
+
+    # ---------- Vectorized passes ----------
+    def _remember(self):
+        n = self.n
+        self.px[:n] = self.x[:n]; self.py[:n] = self.y[:n]
+
+    def move(self):
+        self._remember()
+        n = self.n
+        self.x[:n] += self.vx[:n]; self.y[:n] += self.vy[:n]
+
+    def shift(self, dx, dy=0):
+        """Move every live projectile by the same amount (player bullets share one speed)."""
+        self._remember()
+        n = self.n
+        if dx: self.x[:n] += dx
+        if dy: self.y[:n] += dy
+
+    def overlapping(self, rect):
+        """Ascending indices of live projectiles whose box overlaps `rect` (pygame.Rect semantics)."""
+        n = self.n
+        x = self.x[:n]; y = self.y[:n]; s = self.size[:n]
+        mask = (x < rect.right) & (x + s > rect.left) & (y < rect.bottom) & (y + s > rect.top) & self.alive[:n]
+        return np.flatnonzero(mask)
+
+    def kill(self, which):
+        """Mark projectiles dead by index array or boolean mask; call compact() to sweep."""
+        self.alive[:self.n][which] = False
+
+    def kill_outside(self, left, top, right, bottom):
+        """Mark projectiles that are fully outside the given bounds."""
+        n = self.n
+        x = self.x[:n]; y = self.y[:n]; s = self.size[:n]
+        self.alive[:n] &= ~((x + s < left) | (x > right) | (y + s < top) | (y > bottom))
+
+    def compact(self):
+        """Sweep dead slots in one pass, keeping spawn order."""
+        n = self.n
+        keep = self.alive[:n]
+        m = int(np.count_nonzero(keep))
+        if m == n: return
+        for a in (self.x, self.y, self.px, self.py, self.vx, self.vy, self.size):
+            a[:m] = a[:n][keep]
+        self.alive[:m] = True
+        self.n = m
+
+    def corners(self, alpha=1.0):
+        """[x, y] top-left pixel of every live projectile (as boxes()), plus the int sizes array."""
+        n = self.n
+        x = self.x[:n]; y = self.y[:n]
+        if alpha < 1.0:
+            x = self.px[:n] + (x - self.px[:n]) * alpha; y = self.py[:n] + (y - self.py[:n]) * alpha
+        return np.floor(np.column_stack((x, y))).astype(np.int64).tolist(), self.size[:n].astype(np.int64)
+
+    def boxes(self, alpha=1.0):
+        """(x, y, size) tuples of live projectiles, floored to whole pixels for drawing.
+
+        alpha < 1 blends from the previous position (render interpolation); 1.0 is the current one.
+        """
+        n = self.n
+        x = self.x[:n]; y = self.y[:n]
+        if alpha < 1.0:
+            x = self.px[:n] + (x - self.px[:n]) * alpha; y = self.py[:n] + (y - self.py[:n]) * alpha
+        return zip(np.floor(x).astype(np.int64).tolist(), np.floor(y).astype(np.int64).tolist(),
+                   self.size[:n].astype(np.int64).tolist())
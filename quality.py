@@ -0,0 +1,67 @@
+from collections import deque
+
+# Adaptive render quality. The governor is fed each frame's work time (time spent
+# before the frame cap's sleep, i.e. Clock.get_rawtime()) and keeps a rolling
+# window of it. When the window's mean eats into the frame budget it steps one
+# quality level down; only after a much longer calm stretch does it step back up,
+# so it does not flap around the threshold. Quality only changes how frames are
+# drawn, never the simulation.
+
+class QualityLevel:
+    """What the renderer may spend on one quality step.
+
+    hp_bars       per-enemy HP bars
+    item_sprites  item icons (else flat squares in the icon's colour)
+    particles     multiplier on particles per burst (0 = none)
+    overlay_alpha translucent F3 overlay (else opaque)
+    dirty_rects   restore the background only under what moved instead of blitting all of it
+    """
+    __slots__ = ("name", "hp_bars", "item_sprites", "particles", "overlay_alpha", "dirty_rects")
+
+    def __init__(self, name, hp_bars=True, item_sprites=True, particles=1.0, overlay_alpha=True, dirty_rects=False):
+        self.name = name; self.hp_bars = hp_bars; self.item_sprites = item_sprites
+        self.particles = particles; self.overlay_alpha = overlay_alpha; self.dirty_rects = dirty_rects
+
+LEVELS = (
+    QualityLevel("high"),
+    QualityLevel("medium", particles=0.5, overlay_alpha=False),
+    QualityLevel("low", hp_bars=False, item_sprites=False, particles=0.25, overlay_alpha=False, dirty_rects=True),
+    QualityLevel("minimal", hp_bars=False, item_sprites=False, particles=0.0, overlay_alpha=False, dirty_rects=True),
+)
+QUALITY_NAMES = tuple(q.name for q in LEVELS)
+
+class QualityGovernor:
+    """Picks an index into `levels` (0 = best). With auto=False it stays where it is put."""
+
+    def __init__(self, target_fps=60, levels=LEVELS, start=0, auto=True, window=60,
+                 down_at=0.85, up_at=0.5, up_after=300):
+        self.levels = levels; self.index = start; self.auto = auto
+        self.budget_ms = 1000.0 / target_fps
+        self.down_at = down_at; self.up_at = up_at; self.up_after = up_after
+        self.samples = deque(maxlen=window)
+        self.calm = 0            # consecutive frames under up_at of the budget
+        self.changes = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    @property
+    def label(self):
+        return f"{self.level.name} (auto)" if self.auto else self.level.name
+
+    def set(self, index):
+        self.index = min(max(index, 0), len(self.levels) - 1)
+        self.samples.clear(); self.calm = 0; self.changes += 1
+
+    def sample(self, work_ms):
+        """Record one frame's work time; True if the level changed."""
+        if not self.auto: return False
+        self.samples.append(work_ms)
+        self.calm = self.calm + 1 if work_ms < self.up_at * self.budget_ms else 0
+        if len(self.samples) == self.samples.maxlen and self.index < len(self.levels) - 1 \
+                and sum(self.samples) / len(self.samples) > self.down_at * self.budget_ms:
+            self.set(self.index + 1); return True
+        if self.calm >= self.up_after and self.index > 0:
+            self.set(self.index - 1); return True
+        return False
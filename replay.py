@@ -0,0 +1,101 @@
+import json
+import zlib
+import struct
+import hashlib
+
+from saving import write_bytes_atomic
+from world import AUTO_FIRE_TICKS, GameWorld, Inputs
+
+# Input recording and replay. A recording is the session seed, the save data the
+# session started from, and one record per GameWorld.step_ticks() call: held
+# directions and fire, the discrete key presses and clicks, and how many ticks
+# ran. Fed back through step_ticks() on a world with the same seed it reproduces
+# the run tick for tick, with no window and no frame cap. (F9 reloads whatever is
+# on disk in a live session; a replay reloads the recorded save data instead.)
+
+MAGIC = b"RPL1"
+_HEAD = struct.Struct("<4sQI")       # magic, seed, length of the JSON meta block
+_STEP = struct.Struct("<BHBB")       # held-direction/quit bits, ticks, #keys, #clicks
+_KEY = struct.Struct("<i")
+_CLICK = struct.Struct("<hh")
+
+_LEFT, _RIGHT, _UP, _DOWN, _QUIT, _FIRE = 1, 2, 4, 8, 16, 32
+
+def state_digest(world):
+    """Short hash of everything gameplay depends on; equal digests mean the runs matched."""
+    h = hashlib.sha1()
+    h.update(repr((world.frame, world.game_state, world.level, world.player_hp, world.player_exp,
+                   world.player_gold, tuple(world.player), len(world.bullets), len(world.enemy_bullets),
+                   [(tuple(e.rect), e.hp) for e in world.enemies],
+                   [(tuple(i.rect), i.type) for i in world.items],
+                   (tuple(world.boss.rect), world.boss.hp) if world.boss else None)).encode())
+    h.update(world.bullets.x[:world.bullets.n].tobytes()); h.update(world.enemy_bullets.x[:world.enemy_bullets.n].tobytes())
+    return h.hexdigest()[:16]
+
+class InputRecorder:
+    """Attach to a world (world.recorder = rec) before its first step; save() when the session ends."""
+
+    def __init__(self, world):
+        self.seed = world.seed
+        self.start_save = dict(world.save_data)
+        self.buf = bytearray()
+        self.steps = 0; self.ticks = 0
+
+    def record(self, inputs, n):
+        bits = ((_LEFT if inputs.left else 0) | (_RIGHT if inputs.right else 0) | (_UP if inputs.up else 0)
+                | (_DOWN if inputs.down else 0) | (_QUIT if inputs.quit else 0) | (_FIRE if inputs.fire else 0))
+        keys = inputs.keys; clicks = inputs.clicks
+        self.buf += _STEP.pack(bits, n, len(keys), len(clicks))
+        for k in keys: self.buf += _KEY.pack(k)
+        for x, y in clicks: self.buf += _CLICK.pack(x, y)
+        self.steps += 1; self.ticks += n
+
+    def save(self, path, world=None):
+        """Write the recording; with `world`, its final digest is stored so replays can check themselves."""
+        meta = {"save": self.start_save, "steps": self.steps, "ticks": self.ticks,
+                "digest": state_digest(world) if world is not None else None,
+                "pixel_collision": world is not None and world.hit_masks is not None,
+                "auto_fire_ticks": world.auto_fire_ticks if world is not None else AUTO_FIRE_TICKS}
+        blob = json.dumps(meta).encode("utf-8")
+        write_bytes_atomic(path, _HEAD.pack(MAGIC, self.seed, len(blob)) + blob + zlib.compress(bytes(self.buf), 9))
+
+class Recording:
+    def __init__(self, seed, meta, steps):
+        self.seed = seed; self.meta = meta; self.steps = steps
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f: data = f.read()
+        magic, seed, mlen = _HEAD.unpack_from(data)
+        if magic != MAGIC: raise ValueError(f"{path}: not a replay file")
+        off = _HEAD.size
+        meta = json.loads(data[off:off + mlen].decode("utf-8"))
+        body = zlib.decompress(data[off + mlen:])
+        steps = []; pos = 0; unpack_key = _KEY.unpack_from; unpack_click = _CLICK.unpack_from
+        while pos < len(body):
+            bits, n, nk, nc = _STEP.unpack_from(body, pos); pos += _STEP.size
+            keys = tuple(unpack_key(body, pos + i * _KEY.size)[0] for i in range(nk)); pos += nk * _KEY.size
+            clicks = tuple(unpack_click(body, pos + i * _CLICK.size) for i in range(nc)); pos += nc * _CLICK.size
+            steps.append((Inputs(bool(bits & _LEFT), bool(bits & _RIGHT), bool(bits & _UP), bool(bits & _DOWN),
+                                 keys, clicks, bool(bits & _QUIT), bool(bits & _FIRE)), n))
+        return cls(seed, meta, steps)
+
+    def world(self):
+        """A fresh, disk-free world in the state the recording started from."""
+        w = GameWorld(save_path=None, seed=self.seed)
+        w.save_data = dict(self.meta["save"])
+        w.auto_fire_ticks = self.meta.get("auto_fire_ticks", AUTO_FIRE_TICKS)
+        return w
+
+    def play(self, world=None):
+        """Re-drive a world through every recorded step as fast as possible. Returns the world."""
+        world = world or self.world()
+        for inputs, n in self.steps:
+            world.step_ticks(inputs, n)
+            if world.quit_requested: break
+        return world
+
+    def verify(self, world):
+        """True/False against the digest stored at record time; None if the recording has none."""
+        expected = self.meta.get("digest")
+        return None if expected is None else expected == state_digest(world)
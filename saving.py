@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import tempfile
+import threading
+
+# Save/Load. Writes are atomic (temp file + fsync + rename) so a crash can never
+# leave a truncated savegame.json; SaveService moves them off the frame loop.
+
+SAVE_PATH = "savegame.json"
+DEFAULT_SAVE = {"max_unlocked": 1, "gold": 0}
+
+# mkstemp() creates files 0600; new saves get the mode open() would have given them.
+# Read once here: os.umask() can only be queried by setting it, which is not thread-safe.
+_UMASK = os.umask(0); os.umask(_UMASK)
+
+def write_atomic(path, data):
+    write_bytes_atomic(path, json.dumps(data).encode("utf-8"))
+
+def write_bytes_atomic(path, blob):
+    d = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=d)
+    try:
+        try: mode = os.stat(path).st_mode & 0o7777   # keep the replaced file's permissions
+        except FileNotFoundError: mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # make the rename itself durable
+        try:
+            dfd = os.open(d, os.O_RDONLY | os.O_DIRECTORY)
+            try: os.fsync(dfd)
+            finally: os.close(dfd)
+        except OSError: pass
+
+def save_game(max_unlocked, gold=0, path=SAVE_PATH):
+    data = {"max_unlocked": int(max_unlocked), "gold": int(gold)}
+    try:
+        write_atomic(path, data)
+        return True
+    except Exception as e:
+        print("Save failed:", e); return False
+
+def load_game(path=SAVE_PATH):
+    if not os.path.exists(path): return dict(DEFAULT_SAVE)
+    try:
+        with open(path, "r", encoding="utf-8") as f: data = json.load(f)
+        if not isinstance(data, dict): raise ValueError("Bad format")
+        return {"max_unlocked": int(data.get("max_unlocked", 1)), "gold": int(data.get("gold", 0))}
+    except Exception as e:
+        print("Load failed:", e); return dict(DEFAULT_SAVE)
+
+class SaveService:
+    """Background save writer.
+
+    request() only records the newest snapshot and returns; a worker thread writes
+    it at most once per `interval` seconds, so a burst of kills costs one write.
+    flush() blocks until everything requested so far is on disk; close() flushes
+    and stops the worker (call it on quit).
+    """
+
+    def __init__(self, path=SAVE_PATH, interval=1.0):
+        self.path = path; self.interval = interval
+        self.requests = 0; self.writes = 0; self.failures = 0
+        self._cond = threading.Condition()
+        self._pending = None; self._busy = False; self._urgent = False; self._closed = False
+        self._last_write = float("-inf")
+        self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self._thread.start()
+
+    def request(self, max_unlocked, gold=0):
+        data = {"max_unlocked": int(max_unlocked), "gold": int(gold)}
+        with self._cond:
+            if self._closed: return False
+            self._pending = data; self.requests += 1
+            self._cond.notify_all()
+        return True
+
+    def _run(self):
+        cond = self._cond
+        while True:
+            with cond:
+                while self._pending is None and not self._closed: cond.wait()
+                if self._pending is None: return
+                # coalesce: sit out the rest of the interval, newer requests replace _pending
+                delay = self._last_write + self.interval - time.monotonic()
+                while delay > 0 and not (self._urgent or self._closed):
+                    cond.wait(delay); delay = self._last_write + self.interval - time.monotonic()
+                data = self._pending; self._pending = None; self._busy = True
+            ok = save_game(data["max_unlocked"], data["gold"], self.path)
+            with cond:
+                self._busy = False; self._last_write = time.monotonic()
+                self.writes += 1; self.failures += not ok
+                cond.notify_all()
+
+    def flush(self, timeout=5.0):
+        with self._cond:
+            self._urgent = True; self._cond.notify_all()
+            done = self._cond.wait_for(lambda: self._pending is None and not self._busy, timeout)
+            self._urgent = False
+        return done
+
+    def close(self, timeout=5.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True; self._cond.notify_all()
+        self._thread.join(timeout)
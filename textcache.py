@@ -0,0 +1,29 @@
+from collections import OrderedDict
+
+# LRU cache of rendered text surfaces. The menus, HUD and shop draw the same few
+# strings every frame; rasterize each (font, text, color, antialias) once.
+
+class TextCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0; self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.entries.move_to_end(key); self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self.entries[key] = font.render(text, antialias, color)
+        if len(self.entries) > self.max_entries: self.entries.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.entries.clear()
+
+TEXT_CACHE = TextCache()
+
+def render_text(font, text, color, antialias=True):
+    return TEXT_CACHE.render(font, text, color, antialias)
@@ -0,0 +1,61 @@
+import math
+from collections import deque
+
+# Fixed-timestep accumulator. Real frame time goes in, whole simulation ticks come
+# out; the leftover fraction is the interpolation factor for rendering.
+
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed ticks.
+
+    max_steps caps how many ticks one frame may run to catch up (the rest of the
+    backlog is dropped rather than spiralling; None = no cap); frame_skip is the number of
+    renders in a row that may be skipped while catching up (0 = never skip).
+    """
+
+    def __init__(self, tick, max_steps=5, frame_skip=0, window=240):
+        self.tick = tick; self.max_steps = max_steps; self.frame_skip = frame_skip
+        self.acc = 0.0
+        self.last_steps = 0; self.skipped_in_row = 0
+        self.ticks = 0; self.frames = 0; self.skipped = 0; self.dropped = 0.0
+        self.frame_times = deque(maxlen=window)
+
+    @property
+    def alpha(self):
+        """How far between the last two ticks the current render falls, in [0, 1)."""
+        return min(max(self.acc / self.tick, 0.0), 1.0)
+
+    def advance(self, dt):
+        """Add `dt` seconds of real time; returns the number of ticks to simulate now."""
+        self.frames += 1; self.frame_times.append(dt)
+        self.acc += dt
+        n = int((self.acc + 1e-9) // self.tick)
+        if self.max_steps is not None and n > self.max_steps:
+            n = self.max_steps
+            backlog = self.acc - n * self.tick
+            self.acc = backlog % self.tick
+            self.dropped += backlog - self.acc
+        else:
+            self.acc -= n * self.tick
+        self.last_steps = n; self.ticks += n
+        return n
+
+    def skip_render(self):
+        """True if this frame's render should be skipped to let the simulation catch up."""
+        if self.frame_skip and self.last_steps > 1 and self.skipped_in_row < self.frame_skip:
+            self.skipped_in_row += 1; self.skipped += 1
+            return True
+        self.skipped_in_row = 0
+        return False
+
+    def stats(self):
+        """Frame pacing over the recent window: mean/stdev/p99/max frame time in ms, plus totals."""
+        ts = sorted(self.frame_times)
+        if not ts: return {}
+        mean = sum(ts) / len(ts)
+        stdev = math.sqrt(sum((t - mean) ** 2 for t in ts) / len(ts))
+        return {
+            "fps": 1.0 / mean if mean > 0 else 0.0,
+            "mean_ms": mean * 1000, "jitter_ms": stdev * 1000,
+            "p99_ms": ts[min(len(ts) - 1, int(len(ts) * 0.99))] * 1000, "max_ms": ts[-1] * 1000,
+            "ticks": self.ticks, "frames": self.frames, "skipped": self.skipped, "dropped_s": self.dropped,
+        }
@@ -0,0 +1,565 @@
+import pygame
+import random
+import os
+import time
+
+from collision import SpatialHash
+from pools import RecordPool, sweep
+from entities import Enemy, Item, Boss, ITEM_TYPES, move_enemies, fall_items, move_boss
+from saving import SAVE_PATH, DEFAULT_SAVE, SaveService, load_game
+from projectiles import ProjectileStore
+from timestep import FixedTimestep
+from levels import ERA_NAMES, MAX_LEVEL, level_config
+
+# Simulation core: all game state and rules, no window, no drawing.
+# new.py drives it interactively; headless runs step it directly.
+
+WIDTH, HEIGHT = 800, 400
+FPS = 60
+FRAME_DT = 1.0 / FPS
+
+# Game states
+STATE_MENU="menu"; STATE_LEVEL_SELECT="level_select"
+STATE_LEVEL_INTRO="level_intro"; STATE_PLAYING="playing"; STATE_SHOP="shop"
+STATE_GAME_OVER="game_over"; STATE_VICTORY="victory"
+
+# Player
+PLAYER_MAX_HP = 10
+player_speed_base = 5
+bullet_speed_base = 7
+AUTO_FIRE_TICKS = 8   # ticks between shots while fire is held (0 = no auto-fire)
+
+# Shop & drops
+SHOP_PRICES = {"double": 300, "speed": 200, "heal": 150}
+ITEM_DROP_CHANCE = 0.8
+
+# ---------- Layout (shared by click handling and drawing) ----------
+def menu_button_rects():
+    bw, bh = 360, 64
+    gap = 26
+    start_y = HEIGHT//2 - (bh*3 + gap*2)//2
+    return [
+        pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*0, bw, bh),  # Continue
+        pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*1, bw, bh),  # Level Select
+        pygame.Rect(WIDTH//2 - bw//2, start_y + (bh+gap)*2, bw, bh),  # New Game
+    ]
+
+def menu_quit_rect():
+    return pygame.Rect(WIDTH//2-120, HEIGHT-56, 240, 40)
+
+def level_card_rects(n=MAX_LEVEL):
+    spacing = 40
+    bw, bh = min(200, (WIDTH - 40 - spacing*(n-1)) // n), 120
+    total_w = bw*n + spacing*(n-1)
+    start_x = WIDTH//2 - total_w//2
+    y = HEIGHT//2 - bh//2
+    return [pygame.Rect(start_x + i*(bw+spacing), y, bw, bh) for i in range(n)]
+
+# ---------- Input ----------
+class Inputs:
+    """One frame of player input: held directions and fire plus the discrete presses/clicks since the last step."""
+    __slots__ = ("left", "right", "up", "down", "keys", "clicks", "quit", "fire")
+
+    def __init__(self, left=False, right=False, up=False, down=False, keys=(), clicks=(), quit=False, fire=False):
+        self.left = left; self.right = right; self.up = up; self.down = down
+        self.keys = keys; self.clicks = clicks; self.quit = quit; self.fire = fire
+
+NO_INPUT = Inputs()
+
+class GameWorld:
+    """The whole game session. Feed it Inputs through step(); read its fields to draw.
+
+    Things the presentation layer should react to (sounds, effects) are appended to
+    `events` as (name, x, y) tuples and cleared at the start of every step.
+    Pass save_path=None to keep a session off the disk (soak tests, CI); otherwise
+    saves go through a background SaveService and are flushed on quit.
+
+    The simulation runs in fixed 60 Hz ticks; all speeds and timers are per tick.
+    max_steps/frame_skip configure the FixedTimestep that turns step() dt into ticks.
+    Entities remember their position from the previous tick (player_prev, px/py,
+    ProjectileStore.px/py) so renderers can interpolate with timestep.alpha.
+
+    All gameplay randomness comes from `rng`, seeded with `seed`, so a seed plus the
+    sequence of step_ticks() inputs reproduces a session exactly (see replay.py).
+    """
+
+    def __init__(self, save_path=SAVE_PATH, max_steps=None, frame_skip=0, seed=None):
+        self.save_path = save_path
+        self.save_data = load_game(save_path) if save_path else dict(DEFAULT_SAVE)
+        self.saver = SaveService(save_path) if save_path else None
+        self.events = []
+        self.quit_requested = False
+        self.frame = 0
+        self.time = 0.0
+        self.timestep = FixedTimestep(FRAME_DT, max_steps, frame_skip)
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        self.recorder = None   # replay.InputRecorder, if this session is being recorded
+        self.shop_prices = dict(SHOP_PRICES); self.drop_chance = ITEM_DROP_CHANCE   # per world, for balance runs
+        self.profiler = None   # profiler.FrameProfiler; when enabled, play phases are timed
+        self.hit_masks = None  # hitmasks.HitMasks; when set, hits also need the drawn sprites' pixels to overlap
+        self.auto_fire_ticks = AUTO_FIRE_TICKS; self.fire_cooldown = 0
+
+        self.player = pygame.Rect(50, HEIGHT-60, 40, 40); self.player_prev = self.player.copy()
+        self.player_hp = PLAYER_MAX_HP
+        self.player_exp = 0
+        self.player_gold = 0
+        self.bullet_double = False; self.bullet_double_timer = 0
+        self.bullet_fast = False; self.bullet_fast_timer = 0
+
+        self.bullets = ProjectileStore(); self.enemy_bullets = ProjectileStore()
+        self.enemies = []; self.items = []
+        self.enemy_pool = RecordPool(Enemy, prefill=16)
+        self.item_pool = RecordPool(Item, prefill=16)
+        self.enemy_spawn_timer = 0; self.spawn_wave = 0
+        self.boss = None; self.boss_alive = False
+
+        # Broad-phase grids, rebuilt every frame from the entity lists
+        self.enemy_grid = SpatialHash(WIDTH, HEIGHT); self.item_grid = SpatialHash(WIDTH, HEIGHT)
+        self._probe = pygame.Rect(0, 0, 0, 0)
+
+        self.level = 1; self.level_intro_timer = 0
+        self.cfg = level_config(1)
+        self.autosave_counter = 0
+        self.game_state = STATE_MENU
+
+    # ---------- Persistence ----------
+    def save(self, max_unlocked, gold=0):
+        if not self.saver: return True
+        return self.saver.request(max_unlocked, gold)
+
+    def load(self):
+        if not self.saver: return dict(self.save_data)
+        self.saver.flush()
+        return load_game(self.save_path)
+
+    def save_progress(self):
+        return self.save(max(self.save_data.get("max_unlocked",1), self.level), self.player_gold)
+
+    def save_now(self):
+        """Write progress now and mirror it into save_data (F5)."""
+        max_unlocked = max(self.save_data.get("max_unlocked", 1), self.level)
+        if self.save(max_unlocked, self.player_gold):
+            self.save_data["max_unlocked"] = max_unlocked
+            self.save_data["gold"] = self.player_gold
+
+    def request_quit(self):
+        self.save_progress()
+        self.close()
+        self.quit_requested = True
+
+    def close(self):
+        if self.saver: self.saver.close()
+
+    # ---------- Helpers ----------
+    def reset_player(self):
+        self.player.x, self.player.y = 50, HEIGHT-60
+        self.player_prev.topleft = self.player.topleft
+        self.player_hp = PLAYER_MAX_HP
+        self.player_exp = 0
+
+    def clear_entities(self):
+        self.bullets.clear(); self.enemy_bullets.clear()
+        self.enemy_pool.release_all(self.enemies); self.item_pool.release_all(self.items)
+
+    def start_level(self, lv):
+        self.level = lv; self.cfg = level_config(lv); self.spawn_wave = 0
+        self.clear_entities(); self.reset_player()
+        self.boss = None; self.boss_alive = False
+        self.level_intro_timer = 90; self.game_state = STATE_LEVEL_INTRO
+
+    def spawn_enemy(self):
+        cfg = self.cfg
+        y = self.rng.choice(cfg.lanes)
+        vy = self.rng.choice(cfg.enemy_vy)
+        return self.enemy_pool.acquire().reset(WIDTH, y, cfg.enemy_hp, vy)
+
+    def spawn_boss(self):
+        hp = self.cfg.boss_hp; vy = self.rng.choice(self.cfg.boss_vy)
+        return Boss(WIDTH-220, HEIGHT//2-80, 160, hp, vy)
+
+    def boss_attack_pattern(self, b):
+        self.cfg.boss_pattern.fire(self.enemy_bullets, b.timer, b.rect.centerx, b.rect.centery,
+                                   b.hp / self.cfg.boss_hp, self.player.center)
+
+    def fire(self):
+        self.fire_cooldown = self.auto_fire_ticks
+        self.events.append(("shoot", self.player.right, self.player.centery))
+        self.bullets.spawn(self.player.right, self.player.centery-5, 0, 0, 10)
+        if self.bullet_double:
+            self.bullets.spawn(self.player.right, self.player.centery+10, 0, 0, 10)
+
+    def handle_shop_keydown(self, key):
+        sd = self.save_data; price = self.shop_prices
+        if key == pygame.K_1 and self.player_gold >= price["double"]: self.bullet_double=True; self.bullet_double_timer=300; self.player_gold-=price["double"]; self.save(sd.get("max_unlocked",1), self.player_gold)
+        elif key == pygame.K_2 and self.player_gold >= price["speed"]: self.bullet_fast=True; self.bullet_fast_timer=300; self.player_gold-=price["speed"]; self.save(sd.get("max_unlocked",1), self.player_gold)
+        elif key == pygame.K_3 and self.player_gold >= price["heal"]: self.player_hp=min(PLAYER_MAX_HP, self.player_hp+3); self.player_gold-=price["heal"]; self.save(sd.get("max_unlocked",1), self.player_gold)
+        elif key == pygame.K_ESCAPE: self.game_state = STATE_PLAYING
+
+    def next_level_or_victory(self):
+        if self.level >= MAX_LEVEL:
+            self.game_state = STATE_VICTORY
+        else:
+            self.level += 1
+            if self.save_data.get("max_unlocked", 1) < self.level:
+                self.save_data["max_unlocked"] = self.level
+                self.save_data["gold"] = self.player_gold
+                self.save(self.save_data["max_unlocked"], self.save_data["gold"])
+            self.start_level(self.level)
+
+    def reset_full_game(self):
+        self.level = 1; self.player_gold = 0
+        self.bullet_double = False; self.bullet_double_timer = 0
+        self.bullet_fast = False; self.bullet_fast_timer = 0
+        self.start_level(self.level)
+
+    def new_game(self):
+        self.save_data["max_unlocked"] = 1; self.save_data["gold"] = 0; self.save(1,0)
+        self.start_level(1)
+
+    def continue_game(self):
+        self.start_level(max(1, min(self.save_data.get("max_unlocked",1), MAX_LEVEL)))
+
+    # ---------- Input handling ----------
+    @property
+    def scene(self):
+        return SCENES[self.game_state]
+
+    def handle_key(self, key):
+        SCENES[self.game_state].key(self, key)
+
+    def handle_click(self, pos):
+        SCENES[self.game_state].click(self, pos)
+
+    # ---------- Stepping ----------
+    def step(self, inputs=NO_INPUT, dt=FRAME_DT):
+        """Apply inputs, then advance the simulation by dt seconds in whole 60 Hz ticks.
+
+        Returns the number of ticks simulated (leftover time carries over to the next call).
+        """
+        return self.step_ticks(inputs, self.timestep.advance(dt))
+
+    def step_ticks(self, inputs, n):
+        """Apply inputs, then run exactly n ticks. Replays drive the world through here."""
+        if self.recorder is not None: self.recorder.record(inputs, n)
+        self.events.clear()
+        if inputs.quit: self.request_quit()
+        for key in inputs.keys:
+            if self.quit_requested: break
+            self.handle_key(key)
+        for pos in inputs.clicks:
+            if self.quit_requested: break
+            self.handle_click(pos)
+
+        for i in range(n):
+            if self.quit_requested: return i
+            self.update(inputs)
+        return n
+
+    def step_many(self, steps):
+        """step_ticks() for each (inputs, n) in turn, as one frame: `events` keeps what all of them raised.
+        Returns the total number of ticks simulated."""
+        done = 0; events = []
+        for inputs, n in steps:
+            done += self.step_ticks(inputs, n); events += self.events
+            if self.quit_requested: break
+        self.events[:] = events
+        return done
+
+    def auto_fire(self, inputs):
+        """Held fire shoots every auto_fire_ticks ticks, counted from the last shot of any kind."""
+        if inputs.fire and self.auto_fire_ticks and not self.fire_cooldown: self.fire()
+        if self.fire_cooldown > 0: self.fire_cooldown -= 1
+
+    def update(self, inputs):
+        self.frame += 1; self.time += FRAME_DT
+        SCENES[self.game_state].tick(self, inputs)
+
+    # One tick of play, in phases; the benchmark harness times them one by one.
+    PLAY_PHASES = ("movement", "collisions", "items", "buffs", "boss", "autosave")
+
+    def update_playing(self, inputs):
+        prof = self.profiler
+        if prof is not None and prof.enabled:
+            return self._update_playing_timed(inputs, prof)
+        self.update_movement(inputs)
+        self.update_collisions()
+        self.update_items()
+        self.update_buffs()
+        self.update_boss()
+        self.update_autosave()
+
+    def _update_playing_timed(self, inputs, prof):
+        clock = time.perf_counter_ns
+        for name in self.PLAY_PHASES:
+            fn = getattr(self, "update_" + name)
+            t0 = clock()
+            fn(inputs) if name == "movement" else fn()
+            prof.add(name, t0, clock() - t0)
+
+    def update_movement(self, inputs):
+        player = self.player; bullets = self.bullets; enemies = self.enemies
+        cfg = self.cfg
+
+        self.player_prev.topleft = player.topleft
+        spd = player_speed_base
+        if inputs.left  and player.left  > 0:     player.x -= spd
+        if inputs.right and player.right < WIDTH: player.x += spd
+        if inputs.up    and player.top   > 0:     player.y -= spd
+        if inputs.down  and player.bottom< HEIGHT:player.y += spd
+
+        # Player bullets
+        speed = bullet_speed_base*(2 if self.bullet_fast else 1)
+        bullets.shift(speed)
+        bullets.kill(bullets.x[:bullets.n] + bullets.size[:bullets.n] > WIDTH); bullets.compact()
+
+        # Spawn enemies
+        self.enemy_spawn_timer += 1
+        if not self.boss_alive:
+            gaps = cfg.spawn_gaps
+            if self.enemy_spawn_timer > gaps[self.spawn_wave] and self.boss is None:
+                enemies.append(self.spawn_enemy()); self.enemy_spawn_timer = 0
+                self.spawn_wave = (self.spawn_wave + 1) % len(gaps)
+
+        # Enemy move & shoot
+        xs, ys = move_enemies(enemies, cfg.enemy_step, HEIGHT, self.rng, cfg.enemy_bullet_chance)
+        if xs: self.enemy_bullets.spawn_many(xs, ys, -5, 0, 8)
+
+        # Enemy bullets
+        self.enemy_bullets.move()
+
+    def update_collisions(self):
+        player = self.player; bullets = self.bullets; enemies = self.enemies
+        enemy_bullets = self.enemy_bullets; items = self.items
+        hm = self.hit_masks
+
+        # Enemy bullets vs player
+        if hm is None: hit = enemy_bullets.overlapping(player)
+        else: hit = hm.bullets_hitting(enemy_bullets, hm.player, player.topleft)
+        if len(hit):
+            self.player_hp -= len(hit); enemy_bullets.kill(hit)
+            self.events.append(("player_hit", player.centerx, player.centery))
+            if self.player_hp <= 0: self.game_state = STATE_GAME_OVER
+        enemy_bullets.kill_outside(0, 0, WIDTH, HEIGHT); enemy_bullets.compact()
+
+        # Collide: player vs enemies
+        e_grid = self.enemy_grid
+        if hm is None:
+            e_grid.rebuild(enemies, "rect"); touching = e_grid.hits(player)
+        else:
+            # index the drawn sprites' bounds instead of the hitboxes, then test pixels
+            shape = hm.enemy[self.level]; bounds = [shape.bounds(e.rect.topleft) for e in enemies]
+            e_grid.rebuild(bounds)
+            touching = [i for i in e_grid.hits(hm.player.bounds(player.topleft))
+                        if hm.player.overlaps(player.topleft, shape, bounds[i].topleft)]
+        for i in touching:
+            e = enemies[i]
+            if not e.alive: continue
+            self.player_hp -= 1; e.alive = False
+            self.events.append(("player_hit", player.centerx, player.centery))
+            if self.player_hp <= 0: self.game_state = STATE_GAME_OVER
+
+        # Bullet vs enemies (one hit per bullet). With few enemies each bullet scans them all
+        # (collidelistall keeps list order); otherwise it asks the grid
+        b = self._probe
+        near = ([e.rect for e in enemies] if hm is None else bounds) if e_grid.linear else None
+        for bi, (bx, by, bs) in enumerate(bullets.boxes()):
+            b.update(bx, by, bs, bs)
+            for i in (b.collidelistall(near) if e_grid.linear else e_grid.candidates(b)):
+                e = enemies[i]
+                if not e.alive: continue
+                if hm is None: touches = b.colliderect(e.rect)
+                else: touches = b.colliderect(bounds[i]) and hm.box_touches(shape, bounds[i].topleft, b)
+                if touches:
+                    bullets.alive[bi] = False; e.hp -= 10
+                    if e.hp <= 0:
+                        self.events.append(("enemy_dead", e.rect.centerx, e.rect.centery))
+                        e.alive = False; self.player_gold += 100
+                        self.save_progress()  # autosave gold
+                        if self.rng.random() < self.drop_chance:
+                            drop = self.rng.choice(ITEM_TYPES)
+                            items.append(self.item_pool.acquire().reset(e.rect.x, e.rect.y, drop))
+                    break
+        bullets.compact(); sweep(enemies, self.enemy_pool)
+
+    def update_items(self):
+        player = self.player; items = self.items
+
+        # Pickups, then falling items
+        it_grid = self.item_grid
+        it_grid.rebuild(items, "rect")
+        for i in it_grid.hits(player):
+            it = items[i]; it.alive = False
+            self.events.append(("pickup", it.rect.centerx, it.rect.centery))
+            if it.type == "heal": self.player_hp = min(PLAYER_MAX_HP, self.player_hp+2)
+            elif it.type == "exp": self.player_exp += 10
+            elif it.type == "speed": self.bullet_fast=True; self.bullet_fast_timer=300
+            elif it.type == "double": self.bullet_double=True; self.bullet_double_timer=300
+        fall_items(items, HEIGHT)
+        sweep(items, self.item_pool)
+
+    def update_buffs(self):
+        if self.bullet_fast:
+            self.bullet_fast_timer -= 1
+            if self.bullet_fast_timer <= 0: self.bullet_fast = False
+        if self.bullet_double:
+            self.bullet_double_timer -= 1
+            if self.bullet_double_timer <= 0: self.bullet_double = False
+
+    def update_boss(self):
+        bullets = self.bullets; cfg = self.cfg
+
+        # Boss spawn when EXP threshold reached
+        if self.player_exp >= cfg.boss_exp and self.boss is None:
+            self.boss = self.spawn_boss(); self.boss_alive = True
+            self.events.append(("boss_spawn", self.boss.rect.centerx, self.boss.rect.centery))
+
+        # Boss behavior
+        boss = self.boss
+        if boss:
+            move_boss(boss, WIDTH - 240, HEIGHT)
+            self.boss_attack_pattern(boss)
+
+            hm = self.hit_masks
+            if hm is None: hit = bullets.overlapping(boss.rect)
+            else: hit = hm.bullets_hitting(bullets, hm.boss[self.level], boss.rect.topleft)
+            if len(hit):
+                # stop at the killing bullet; later ones fly on
+                need = -(-boss.hp // 5)
+                hit = hit[:need]; boss.hp -= 5 * len(hit)
+                self.events.append(("boss_hit", int(bullets.x[hit[0]]) + 10, int(bullets.y[hit[0]]) + 5))
+                bullets.kill(hit); bullets.compact()
+            if boss.hp <= 0:
+                self.events.append(("boss_dead", boss.rect.centerx, boss.rect.centery))
+                self.boss = None; self.boss_alive = False
+                self.player_gold += 1000; self.player_exp += 50
+                current_unlocked = self.save_data.get("max_unlocked", 1)
+                if current_unlocked < min(self.level + 1, MAX_LEVEL):
+                    self.save_data["max_unlocked"] = min(self.level + 1, MAX_LEVEL)
+                    self.save_data["gold"] = self.player_gold
+                    self.save(self.save_data["max_unlocked"], self.save_data["gold"])
+                self.next_level_or_victory()
+
+    def update_autosave(self):
+        # Autosave every ~10 seconds
+        autosave_interval_frames = 600  # 60fps * 10s
+        self.autosave_counter += 1
+        if self.autosave_counter >= autosave_interval_frames:
+            self.save_progress()
+            self.autosave_counter = 0
+
+# ---------- Scenes ----------
+# One object per game state with that state's key, click and tick handlers; GameWorld
+# dispatches through SCENES[game_state]. `static` scenes show a still screen that only
+# input can change, so an interactive loop may sleep until the next event.
+
+class Scene:
+    static = False
+    def key(self, world, key): pass
+    def click(self, world, pos): pass
+    def tick(self, world, inputs): pass
+
+class MenuScene(Scene):
+    static = True
+
+    def key(self, world, key):
+        if key in (pygame.K_RETURN, pygame.K_c): world.continue_game()   # Continue from highest unlocked
+        elif key == pygame.K_n: world.new_game()                       # New game from level 1
+        elif key == pygame.K_l: world.game_state = STATE_LEVEL_SELECT
+        elif key in (pygame.K_q, pygame.K_ESCAPE): world.request_quit()
+
+    def click(self, world, pos):
+        for i, r in enumerate(menu_button_rects()):
+            if r.collidepoint(pos):
+                if i == 0: world.continue_game()
+                elif i == 1: world.game_state = STATE_LEVEL_SELECT
+                elif i == 2: world.new_game()
+        if menu_quit_rect().collidepoint(pos):
+            world.request_quit()
+
+class LevelSelectScene(Scene):
+    static = True
+
+    def key(self, world, key):
+        if key == pygame.K_ESCAPE:
+            world.game_state = STATE_MENU
+        elif pygame.K_1 <= key <= pygame.K_9:
+            lv = key - pygame.K_0
+            if lv <= min(world.save_data.get("max_unlocked",1), MAX_LEVEL):
+                world.start_level(lv)
+
+    def click(self, world, pos):
+        unlocked = world.save_data.get("max_unlocked", 1)
+        for i, rect in enumerate(level_card_rects()):
+            if i+1 <= unlocked and rect.collidepoint(pos):
+                world.start_level(i+1)
+
+class LevelIntroScene(Scene):
+    def key(self, world, key):
+        # allow S to visit shop before start; any other key starts
+        world.game_state = STATE_SHOP if key == pygame.K_s else STATE_PLAYING
+
+    def tick(self, world, inputs):
+        world.level_intro_timer -= 1
+        if world.level_intro_timer <= 0:
+            world.game_state = STATE_PLAYING
+            world.update_playing(inputs)   # the intro's last tick is also the first tick of play
+
+class PlayingScene(Scene):
+    def key(self, world, key):
+        if key == pygame.K_SPACE: world.fire()
+        elif key == pygame.K_s: world.game_state = STATE_SHOP
+        elif key == pygame.K_F5: world.save_now()
+        elif key == pygame.K_F9: world.save_data = world.load()
+
+    def tick(self, world, inputs):
+        world.auto_fire(inputs)
+        world.update_playing(inputs)
+
+class ShopScene(Scene):
+    static = True   # play is paused behind the panel
+
+    def key(self, world, key):
+        world.handle_shop_keydown(key)
+
+class EndScene(Scene):
+    """Game over and victory."""
+    static = True
+
+    def key(self, world, key):
+        if key == pygame.K_r: world.reset_full_game()
+        elif key in (pygame.K_q, pygame.K_ESCAPE): world.request_quit()
+
+SCENES = {
+    STATE_MENU: MenuScene(), STATE_LEVEL_SELECT: LevelSelectScene(), STATE_LEVEL_INTRO: LevelIntroScene(),
+    STATE_PLAYING: PlayingScene(), STATE_SHOP: ShopScene(), STATE_GAME_OVER: EndScene(), STATE_VICTORY: EndScene(),
+}
+
+# ---------- Headless ----------
+def init_headless():
+    """Point SDL at the dummy video/audio drivers so pygame works without a display or sound card."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+
+def autopilot(world):
+    """Tiny scripted player for soak runs: gets into a level, tracks the nearest enemy and keeps firing."""
+    state = world.game_state
+    if state == STATE_MENU: return Inputs(keys=(pygame.K_RETURN,))
+    if state in (STATE_LEVEL_INTRO, STATE_SHOP): return Inputs(keys=(pygame.K_ESCAPE if state == STATE_SHOP else pygame.K_SPACE,))
+    if state in (STATE_GAME_OVER, STATE_VICTORY): return Inputs(keys=(pygame.K_r,))
+    if state != STATE_PLAYING: return NO_INPUT
+    target = world.boss.rect if world.boss else (min(world.enemies, key=lambda e: e.rect.x).rect if world.enemies else None)
+    cy = world.player.centery
+    up = target is not None and target.centery < cy - 4
+    down = target is not None and target.centery > cy + 4
+    keys = (pygame.K_SPACE,) if world.frame % 8 == 0 else ()
+    return Inputs(up=up, down=down, keys=keys)
+
+def run_headless(frames, policy=autopilot, world=None):
+    """Step a world for `frames` frames with no rendering and no frame cap. Returns the world."""
+    world = world or GameWorld(save_path=None)
+    for _ in range(frames):
+        world.step(policy(world), FRAME_DT)
+        if world.quit_requested: break
+    return world